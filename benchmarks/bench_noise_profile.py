@@ -0,0 +1,67 @@
+"""Per-file cost of recomputing the noise STFT for every chunk vs. reusing one NoiseProfile.
+
+    python benchmarks/bench_noise_profile.py --seconds 120 --sr 48000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import noisereduce as nr
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import engine  # noqa: E402
+from noise_profile import NoiseProfile, reduce_with_profile  # noqa: E402
+
+
+def synth(seconds: float, sr: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sr)) / sr
+    tone = 0.3 * np.sin(2 * np.pi * 440 * t) * (t > 1.0) * (np.sin(0.5 * t) > 0)
+    return (tone + 0.05 * rng.standard_normal(len(t))).astype(np.float32)
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--seconds", type=float, default=60.0)
+    p.add_argument("--sr", type=int, default=44100)
+    p.add_argument("--chunks", type=int, default=50)
+    p.add_argument("--repeat", type=int, default=3)
+    p.add_argument("--noise-seconds", type=float, default=engine.NOISE_SECONDS,
+                   help="Length of the noise clip; the saving grows with it.")
+    args = p.parse_args(argv)
+
+    y = synth(args.seconds, args.sr)
+    noise_part = y[:int(args.noise_seconds * args.sr)]
+    stationary_args = {"chunk_size": None, **engine.STATIONARY_ARGS}
+    chunks = np.array_split(y, args.chunks)
+
+    def per_chunk_noise():
+        for c in chunks:
+            nr.reduce_noise(y=c, sr=args.sr, y_noise=noise_part, **stationary_args)
+
+    def shared_profile():
+        profile = NoiseProfile.from_signal(noise_part, args.sr, stationary_args)
+        for c in chunks:
+            reduce_with_profile(c, args.sr, profile, stationary_args)
+
+    results = {}
+    for name, fn in (("per_chunk_noise", per_chunk_noise), ("shared_profile", shared_profile)):
+        fn()  # warm-up
+        best = min(_timed(fn) for _ in range(args.repeat))
+        results[name] = best
+        print(f"{name:16s} {best:8.3f} s")
+    print(f"speedup          {results['per_chunk_noise'] / results['shared_profile']:8.2f}x "
+          f"({args.seconds:g} s @ {args.sr} Hz, {args.chunks} chunks, {args.noise_seconds:g} s noise clip)")
+
+
+def _timed(fn) -> float:
+    t0 = time.perf_counter()
+    fn()
+    return time.perf_counter() - t0
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""Cold-start benchmark: time to first window and time to first processed file.
+
+Every measurement runs in a fresh interpreter, timed from process start in
+the parent, so interpreter start-up and imports count just as a user sees
+them:
+
+    import-main       `import main` alone (measured inside the child)
+    first-window      until NoiseReducerApp's window has been drawn
+    first-file-gui    one file through job_process, the GUI's processing path
+    first-file-cli    `cli.py` on one file, start to exit
+
+    python benchmarks/startup.py --repeat 5 -o startup.json
+    python benchmarks/suite.py compare base-startup.json startup.json
+
+Results use the suite's format, so `suite.py compare` flags regressions.
+first-window needs a display and is skipped without one. Children get a
+throwaway XDG_CACHE_HOME, so no result or profile cache is ever hit.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from suite import ROOT, _environment, write_input  # noqa: E402
+
+IMPORT_MAIN = """
+import time
+t = time.perf_counter()
+import main
+print(time.perf_counter() - t, flush=True)
+"""
+
+FIRST_WINDOW = """
+import os, sys, tkinter
+import main
+try:
+    app = main.NoiseReducerApp()
+except tkinter.TclError as e:
+    print("skip", e, flush=True)
+    sys.exit(0)
+app.update()
+print("ready", flush=True)
+os._exit(0)
+"""
+
+FIRST_FILE_GUI = """
+import sys
+import job_process, settings
+params = settings.default_params()
+job_process.process_file(sys.argv[1], sys.argv[2], params)
+"""
+
+
+def _timed(cmd: list, env: dict, until: str = None):
+    """Seconds from spawning cmd until it exits (or prints a line starting with `until`), and its output."""
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(cmd, cwd=ROOT, env=env, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    lines = []
+    for line in proc.stdout:
+        lines.append(line.strip())
+        if until and line.startswith(until):
+            elapsed = time.perf_counter() - t0
+            proc.kill()
+            proc.wait()
+            return elapsed, lines
+    proc.wait()
+    if proc.returncode:
+        raise RuntimeError(f"{' '.join(cmd[:3])} exited with {proc.returncode}")
+    return time.perf_counter() - t0, lines
+
+
+def measure(name: str, src: str, work: str, env: dict):
+    """One cold run of a benchmark; returns seconds, or None if it can't run here."""
+    py = sys.executable
+    if name == "import-main":
+        _, lines = _timed([py, "-c", IMPORT_MAIN], env)
+        return float(lines[-1])
+    if name == "first-window":
+        elapsed, lines = _timed([py, "-c", FIRST_WINDOW], env, until="ready")
+        return elapsed if lines and lines[-1] == "ready" else None
+    if name == "first-file-gui":
+        return _timed([py, "-c", FIRST_FILE_GUI, src, os.path.join(work, "gui_out.wav")], env)[0]
+    if name == "first-file-cli":
+        return _timed([py, "cli.py", src, "-o", work, "--no-cache", "-j", "1"], env)[0]
+    raise ValueError(f"Unknown benchmark: {name}")
+
+
+BENCHMARKS = ("import-main", "first-window", "first-file-gui", "first-file-cli")
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--seconds", type=float, default=10.0, help="Length of the processed file.")
+    p.add_argument("--rate", type=int, default=48000)
+    p.add_argument("--repeat", type=int, default=3, help="Cold runs per benchmark; the median is reported.")
+    p.add_argument("--only", choices=BENCHMARKS, nargs="+", help="Run a subset.")
+    p.add_argument("-o", "--output", default=f"startup-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    args = p.parse_args(argv)
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="nr-startup-") as work:
+        src = os.path.join(work, "input.wav")
+        write_input(src, {"seconds": args.seconds, "sr": args.rate, "channels": 1, "signal": "speech"})
+        env = dict(os.environ, XDG_CACHE_HOME=os.path.join(work, "cache"))
+        print(f"{'benchmark':<18} {'median s':>9}  runs")
+        for name in args.only or BENCHMARKS:
+            runs = []
+            for _ in range(args.repeat):
+                t = measure(name, src, work, env)
+                if t is None:
+                    break
+                runs.append(round(t, 4))
+            if not runs:
+                print(f"{name:<18} {'skipped':>9}  (no display)")
+                continue
+            wall = statistics.median(runs)
+            results.append({"id": name, "wall_s": round(wall, 4), "wall_runs_s": runs})
+            print(f"{name:<18} {wall:>9.3f}  {', '.join(f'{r:.3f}' for r in runs)}")
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "environment": _environment(),
+                   "repeat": args.repeat, "input_seconds": args.seconds, "cases": results}, f, indent=2)
+    print(f"Results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,343 @@
+"""Reproducible end-to-end benchmark of the denoise engine.
+
+Builds synthetic inputs (speech-band bursts or tones in stationary white
+noise) for every length / rate / channel count, runs engine.process_file on
+each in every mode, and writes throughput, real-time factor, peak RSS, stage
+timings and SNR improvement over the clean reference to a JSON file.
+
+    python benchmarks/suite.py run --preset quick -o base.json
+    python benchmarks/suite.py run --seconds 60 600 --rates 48000 --modes memory streaming -o new.json
+    python benchmarks/suite.py compare base.json new.json
+
+Everything is generated locally; nothing is downloaded. Inputs are written
+and scored block by block, so a 2 h case needs disk space, not RAM. Cases
+whose memory charge (scheduler.estimate_bytes) exceeds the budget, a
+quarter of RAM unless --memory-budget says otherwise, are skipped and listed
+as such: the full preset's 2 h / 96 kHz cases then only run in the
+streaming modes on an ordinary machine. Each case runs in a fresh
+interpreter so its peak RSS is its own; chunk worker processes
+(--chunk-workers > 1) are not included in that figure.
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import numpy as np
+import scipy.signal
+import soundfile as sf
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+SIGNALS = ("speech", "tones")
+MODES = {
+    "memory": {},
+    "streaming": {"streaming": True},
+    "reduced": {"reduced_rate": True},
+    "streaming-reduced": {"streaming": True, "reduced_rate": True},
+    "fir": {"filter_mode": "fir"},
+}
+PRESETS = {
+    "quick": {"seconds": [10, 60], "rates": [44100, 48000], "channels": [1, 2], "signals": ["speech"]},
+    "full": {"seconds": [10, 60, 600, 7200], "rates": [22050, 44100, 48000, 96000], "channels": [1, 2],
+             "signals": list(SIGNALS)},
+}
+BLOCK = 1 << 20
+NOISE_LEVEL = 0.05
+SIGNAL_LEVEL = 0.5
+LEAD_IN_SECONDS = 1.0  # noise only, so the engine's noise window sees no signal
+
+
+def synth_blocks(seconds: float, sr: int, channels: int = 1, signal: str = "speech", seed: int = 0,
+                 block: int = BLOCK):
+    """Yield (noisy, clean) float32 blocks of shape (n, channels); deterministic for a given seed and block."""
+    if signal not in SIGNALS:
+        raise ValueError(f"Unknown signal: {signal}")
+    rng = np.random.default_rng(seed)
+    band = scipy.signal.butter(4, [200, 4000], btype="band", fs=sr, output="sos")
+    zi = np.zeros((band.shape[0], 2))
+    impulse = np.zeros(sr)
+    impulse[0] = 1.0
+    band_gain = np.sqrt(np.sum(scipy.signal.sosfilt(band, impulse) ** 2))
+    channel_gain = np.linspace(1.0, 0.6, channels)
+    total = int(seconds * sr)
+    for start in range(0, total, block):
+        n = min(block, total - start)
+        t = (start + np.arange(n)) / sr
+        if signal == "speech":
+            voice, zi = scipy.signal.sosfilt(band, rng.standard_normal(n), zi=zi)
+            envelope = np.clip(np.sin(2 * np.pi * 2 * t), 0, None) ** 2
+            mono = SIGNAL_LEVEL * voice / band_gain * envelope
+        else:
+            tones = sum(np.sin(2 * np.pi * f * t) / k for k, f in enumerate((220, 440, 880), 1))
+            mono = 0.5 * SIGNAL_LEVEL * tones * (np.sin(2 * np.pi * 0.25 * t) > 0)
+        mono *= t > LEAD_IN_SECONDS
+        clean = mono[:, None] * channel_gain
+        noisy = clean + NOISE_LEVEL * rng.standard_normal((n, channels))
+        yield noisy.astype(np.float32), clean.astype(np.float32)
+
+
+def synth(seconds: float, sr: int, channels: int = 1, signal: str = "speech", seed: int = 0):
+    """synth_blocks' (noisy, clean) as two whole arrays, for benchmarks that work in memory."""
+    blocks = list(synth_blocks(seconds, sr, channels, signal, seed))
+    return np.concatenate([b[0] for b in blocks]), np.concatenate([b[1] for b in blocks])
+
+
+def write_input(path: str, case: dict):
+    with sf.SoundFile(path, "w", case["sr"], case["channels"], subtype="PCM_16") as f:
+        for noisy, _ in synth_blocks(case["seconds"], case["sr"], case["channels"], case["signal"]):
+            f.write(noisy)
+
+
+def score(out_path: str, case: dict) -> dict:
+    """SNR of the input and output against the clean reference, over all channels."""
+    err_in = err_out = power = 0.0
+    with sf.SoundFile(out_path) as f:
+        if f.samplerate != case["sr"]:
+            return {}
+        for noisy, clean in synth_blocks(case["seconds"], case["sr"], case["channels"], case["signal"]):
+            out = f.read(len(clean), dtype="float64", always_2d=True)
+            n = len(out)
+            power += np.sum(clean[:n].astype(np.float64) ** 2)
+            err_in += np.sum((noisy[:n].astype(np.float64) - clean[:n]) ** 2)
+            err_out += np.sum((out - clean[:n]) ** 2)
+    snr_in = 10 * np.log10(power / max(err_in, 1e-20))
+    snr_out = 10 * np.log10(power / max(err_out, 1e-20))
+    return {"snr_in_db": round(float(snr_in), 3), "snr_out_db": round(float(snr_out), 3),
+            "snr_gain_db": round(float(snr_out - snr_in), 3)}
+
+
+def case_id(case: dict) -> str:
+    return f"{case['signal']}-{case['seconds']:g}s-{case['sr']}Hz-{case['channels']}ch-{case['mode']}"
+
+
+def case_params(case: dict, chunk_workers: int) -> dict:
+    import engine
+    params = engine.default_params()
+    params.update(MODES[case["mode"]])
+    params["profile_cache_dir"] = None
+    params["chunk_workers"] = chunk_workers
+    return params
+
+
+def memory_charge(case: dict, chunk_workers: int) -> int:
+    """What the job scheduler would charge this case against its memory budget."""
+    from scheduler import JobScheduler, estimate_bytes
+    sched = JobScheduler()
+    sched.configure(case_params(case, chunk_workers))
+    return estimate_bytes(case["seconds"], case["sr"], case["channels"], sched.block_seconds, sched.scan_seconds)
+
+
+def _run_case(case: dict, src: str, out: str, repeat: int, chunk_workers: int) -> list:
+    """Child-process entry point: warm up, then time `repeat` runs of one case."""
+    import engine
+    from metrics import JobMetrics
+
+    params = case_params(case, chunk_workers)
+
+    # Imports, numba compilation and resampler setup shouldn't land on the first timed run
+    warm = out + ".warm.wav"
+    sf.write(warm, next(synth_blocks(2.0, case["sr"], case["channels"]))[0], case["sr"])
+    engine.process_file(warm, warm + ".out.wav", params)
+    for p in (warm, warm + ".out.wav"):
+        os.remove(p)
+
+    runs = []
+    for _ in range(repeat):
+        m = JobMetrics(src)
+        with m.job():
+            engine.process_file(src, out, params, metrics=m)
+        runs.append(m.to_dict())
+    return runs
+
+
+def _summarise(case: dict, runs: list) -> dict:
+    walls = [r["wall_s"] for r in runs]
+    wall = statistics.median(walls)
+    best = min(runs, key=lambda r: abs(r["wall_s"] - wall))
+    stages = {k[:-len("_wall_s")]: v for k, v in best.items() if k.endswith("_wall_s") and k != "wall_s"}
+    return {
+        "id": case_id(case),
+        **case,
+        "wall_s": round(wall, 4),
+        "wall_runs_s": walls,
+        "cpu_s": best["cpu_s"],
+        "rtf": round(wall / case["seconds"], 5),
+        "throughput_x": round(case["seconds"] / wall, 2) if wall else None,
+        "peak_rss_mb": max((r["peak_rss_mb"] or 0) for r in runs) or None,
+        "stages_wall_s": stages,
+    }
+
+
+def _environment() -> dict:
+    import noisereduce
+    env = {"python": platform.python_version(), "platform": platform.platform(),
+           "machine": platform.machine(), "cpus": os.cpu_count(),
+           "numpy": np.__version__, "scipy": scipy.__version__,
+           "noisereduce": getattr(noisereduce, "__version__", None)}
+    try:
+        env["commit"] = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                                       text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        env["commit"] = None
+    return env
+
+
+def cmd_run(args) -> int:
+    preset = PRESETS[args.preset]
+    grid = {k: getattr(args, k) or preset[k] for k in ("seconds", "rates", "channels", "signals")}
+    modes = args.modes or list(MODES)
+    inputs = [{"signal": sig, "seconds": float(sec), "sr": sr, "channels": ch}
+              for sig, sec, sr, ch in itertools.product(grid["signals"], grid["seconds"], grid["rates"],
+                                                        grid["channels"])]
+    from scheduler import default_memory_budget
+    budget = args.memory_budget * 1024 ** 2 if args.memory_budget else default_memory_budget()
+    print(f"{len(inputs) * len(modes)} case(s), {args.repeat} timed run(s) each, "
+          f"memory budget {budget / 1024 ** 2:.0f} MB")
+    print(f"{'case':<44} {'wall s':>8} {'RTF':>8} {'x RT':>8} {'RSS MB':>8} {'SNR +dB':>8}")
+
+    results, skipped = [], []
+    work = args.work_dir or tempfile.mkdtemp(prefix="nr-bench-")
+    os.makedirs(work, exist_ok=True)
+    try:
+        for inp in inputs:
+            cases = []
+            for mode in modes:
+                case = {**inp, "mode": mode}
+                charge = memory_charge(case, args.chunk_workers)
+                if charge > budget:
+                    skipped.append({"id": case_id(case), **case, "charge_mb": round(charge / 1024 ** 2)})
+                    print(f"{case_id(case):<44} skipped: needs ~{charge / 1024 ** 2:.0f} MB")
+                else:
+                    cases.append(case)
+            if not cases:
+                continue
+            src = os.path.join(work, f"{inp['signal']}-{inp['seconds']:g}s-{inp['sr']}-{inp['channels']}ch.wav")
+            if not os.path.exists(src):
+                write_input(src, inp)
+            for case in cases:
+                out = os.path.join(work, case_id(case) + "_out.wav")
+                # A fresh interpreter per case keeps peak RSS per case, not per run
+                with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+                    runs = pool.submit(_run_case, case, src, out, args.repeat, args.chunk_workers).result()
+                row = _summarise(case, runs)
+                row.update(score(out, case))
+                os.remove(out)
+                results.append(row)
+                print(f"{row['id']:<44} {row['wall_s']:>8.2f} {row['rtf']:>8.4f} {row['throughput_x']:>8.1f} "
+                      f"{row['peak_rss_mb'] or 0:>8.0f} {row.get('snr_gain_db', float('nan')):>8.2f}")
+            if not args.work_dir:
+                os.remove(src)
+    finally:
+        if not args.work_dir:
+            for name in os.listdir(work):
+                os.remove(os.path.join(work, name))
+            os.rmdir(work)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "environment": _environment(),
+                   "repeat": args.repeat, "chunk_workers": args.chunk_workers,
+                   "memory_budget_mb": round(budget / 1024 ** 2), "cases": results, "skipped": skipped}, f, indent=2)
+    print(f"Results written to {args.output}")
+    return 0
+
+
+def compare(base: dict, new: dict, time_tol: float, memory_tol: float, snr_tol: float,
+            min_seconds: float = 0.05) -> list:
+    """Rows of (case id, metric, base, new, change, regressed) for cases present in both runs."""
+    old = {c["id"]: c for c in base["cases"]}
+    rows = []
+    for c in new["cases"]:
+        b = old.get(c["id"])
+        if b is None:
+            continue
+        dt = c["wall_s"] - b["wall_s"]
+        rows.append((c["id"], "wall_s", b["wall_s"], c["wall_s"], dt / b["wall_s"] if b["wall_s"] else 0.0,
+                     dt > time_tol * b["wall_s"] and dt > min_seconds))
+        if b.get("peak_rss_mb") and c.get("peak_rss_mb"):
+            dm = c["peak_rss_mb"] - b["peak_rss_mb"]
+            rows.append((c["id"], "peak_rss_mb", b["peak_rss_mb"], c["peak_rss_mb"], dm / b["peak_rss_mb"],
+                         dm > memory_tol * b["peak_rss_mb"]))
+        if "snr_gain_db" in b and "snr_gain_db" in c:
+            ds = c["snr_gain_db"] - b["snr_gain_db"]
+            rows.append((c["id"], "snr_gain_db", b["snr_gain_db"], c["snr_gain_db"], ds, ds < -snr_tol))
+    return rows
+
+
+def cmd_compare(args) -> int:
+    with open(args.base, "r", encoding="utf-8") as f:
+        base = json.load(f)
+    with open(args.new, "r", encoding="utf-8") as f:
+        new = json.load(f)
+    for label, run in (("base", base), ("new", new)):
+        env = run.get("environment", {})
+        print(f"{label}: {run.get('created')} commit {env.get('commit')} on {env.get('cpus')} CPU(s)")
+    if base.get("environment", {}).get("platform") != new.get("environment", {}).get("platform"):
+        print("warning: runs come from different platforms; timings may not be comparable")
+
+    rows = compare(base, new, args.time_tolerance, args.memory_tolerance, args.snr_tolerance)
+    print(f"{'case':<44} {'metric':<12} {'base':>10} {'new':>10} {'change':>9}")
+    for cid, metric, b, n, change, regressed in rows:
+        shown = f"{change:+.2f}dB" if metric == "snr_gain_db" else f"{change:+.1%}"
+        print(f"{cid:<44} {metric:<12} {b:>10.3f} {n:>10.3f} {shown:>9}{'  REGRESSION' if regressed else ''}")
+
+    missing = {c["id"] for c in base["cases"]} - {c["id"] for c in new["cases"]}
+    skipped = {c["id"] for c in new.get("skipped", [])}
+    for cid in sorted(missing):
+        print(f"{cid:<44} {'skipped (over the memory budget)' if cid in skipped else 'missing'} in the new run")
+    regressions = sum(1 for r in rows if r[-1])
+    print(f"{regressions} regression(s)")
+    return 1 if regressions else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = p.add_subparsers(dest="command", required=True)
+
+    r = sub.add_parser("run", help="Run the benchmark grid and write results as JSON.")
+    r.add_argument("--preset", choices=PRESETS, default="quick",
+                   help="Default grid; the options below override parts of it.")
+    r.add_argument("--seconds", type=float, nargs="+", help="Input lengths.")
+    r.add_argument("--rates", type=int, nargs="+", help="Sample rates.")
+    r.add_argument("--channels", type=int, nargs="+", help="Channel counts.")
+    r.add_argument("--signals", choices=SIGNALS, nargs="+", help="Synthetic signal types.")
+    r.add_argument("--modes", choices=list(MODES), nargs="+", help="Engine modes (default: all).")
+    r.add_argument("--repeat", type=int, default=3, help="Timed runs per case; the median is reported.")
+    r.add_argument("--chunk-workers", type=int, default=1,
+                   help="Chunk worker processes per file (default 1, for stable timings).")
+    r.add_argument("--memory-budget", type=int, default=None, metavar="MB",
+                   help="Skip cases the job scheduler would charge more than this (default: a quarter of RAM).")
+    r.add_argument("--work-dir", default=None,
+                   help="Keep generated inputs here and reuse them across runs (default: a temp dir).")
+    r.add_argument("-o", "--output", default=f"bench-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    r.set_defaults(func=cmd_run)
+
+    c = sub.add_parser("compare", help="Compare two result files; exits 1 on a regression.")
+    c.add_argument("base")
+    c.add_argument("new")
+    c.add_argument("--time-tolerance", type=float, default=0.10,
+                   help="Allowed wall-time increase as a fraction (default: %(default)s).")
+    c.add_argument("--memory-tolerance", type=float, default=0.10,
+                   help="Allowed peak RSS increase as a fraction (default: %(default)s).")
+    c.add_argument("--snr-tolerance", type=float, default=0.25,
+                   help="Allowed drop in SNR improvement, in dB (default: %(default)s).")
+    c.set_defaults(func=cmd_compare)
+    return p
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+"""Chunk-level checkpoints so an interrupted long job resumes instead of restarting.
+
+While a long file is denoised, every finished chunk (and each channel's noise profile)
+is saved to a hidden work directory next to the output,
+`.<name>_cleaned.<ext>.work/`. If the job is cancelled, stopped or the
+process dies, the next run of the same input with the same output-affecting
+parameters reloads those chunks and only denoises the rest. A changed input
+or changed settings invalidate the directory, and it is removed once the
+final output has been written.
+
+Chunks are stored per channel as float32 .npy files at the working rate, so
+the work directory of a job can grow to about twice the size of a 16-bit output.
+"""
+import json
+import os
+import shutil
+
+import numpy as np
+
+from hashing import fast_file_hash, params_hash
+from result_cache import output_params
+from settings import CHECKPOINT_SECONDS, work_dir_for  # noqa: F401
+
+FORMAT_VERSION = 3
+
+
+class IncompleteCheckpoint(RuntimeError):
+    """Raised before writing the output if a checkpointed job is missing chunks."""
+
+
+def _save_atomic(path: str, save):
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        save(f)
+    os.replace(tmp, path)
+
+
+class Checkpoint:
+    """A job's work directory: manifest, noise profile and one file per finished chunk.
+
+    `layout` describes how the job is split (chunk count, block size, rate);
+    when an existing directory belongs to the same input and settings, its
+    stored layout wins so the saved chunks still line up, and callers should
+    read it back from `self.layout`.
+    """
+
+    def __init__(self, file_path: str, out_path: str, params: dict, kind: str, layout: dict):
+        self.work_dir = work_dir_for(out_path)
+        self.manifest_path = os.path.join(self.work_dir, "manifest.json")
+        self.enabled = True
+        self.resumed = 0
+        identity = {
+            "version": FORMAT_VERSION,
+            "kind": kind,
+            "input": fast_file_hash(file_path),
+            "params": params_hash(output_params(params)),
+        }
+        old = self._read_manifest()
+        if old is not None and all(old.get(k) == v for k, v in identity.items()):
+            self.layout = old["layout"]
+            return
+        if os.path.isdir(self.work_dir):
+            shutil.rmtree(self.work_dir, ignore_errors=True)  # stale: other input or settings
+        self.layout = dict(layout)
+        os.makedirs(self.work_dir, exist_ok=True)
+        blob = json.dumps(dict(identity, layout=self.layout), indent=2).encode()
+        _save_atomic(self.manifest_path, lambda f: f.write(blob))
+
+    def _read_manifest(self):
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _chunk_path(self, index: int) -> str:
+        return os.path.join(self.work_dir, f"chunk_{index:05d}.npy")
+
+    def completed(self) -> set:
+        """Indices of the chunks already on disk."""
+        try:
+            names = os.listdir(self.work_dir)
+        except OSError:
+            return set()
+        return {int(n[6:11]) for n in names if n.startswith("chunk_") and n.endswith(".npy")}
+
+    def load(self, index: int, length: int):
+        """A saved chunk of exactly `length` samples, or None if it is missing or damaged."""
+        try:
+            data = np.load(self._chunk_path(index), allow_pickle=False)
+        except (OSError, ValueError):
+            return None
+        if data.ndim != 1 or len(data) != length:
+            return None
+        self.resumed += 1
+        return data.astype(np.float32, copy=False)
+
+    def save(self, index: int, data: np.ndarray):
+        """Persist a finished chunk; a full disk turns checkpointing off instead of failing the job."""
+        if not self.enabled:
+            return
+        try:
+            _save_atomic(self._chunk_path(index),
+                         lambda f: np.save(f, np.asarray(data, dtype=np.float32), allow_pickle=False))
+        except OSError as e:
+            print(f"Checkpointing disabled for {self.work_dir}: {e}")
+            self.enabled = False
+
+    def _profile_path(self, channel: int) -> str:
+        return os.path.join(self.work_dir, f"profile_{channel}.npz")
+
+    def load_profile(self, channel: int = 0):
+        from noise_profile import NoiseProfile
+        try:
+            return NoiseProfile.load(self._profile_path(channel))
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def save_profile(self, profile, channel: int = 0):
+        if self.enabled:
+            try:
+                profile.save(self._profile_path(channel))
+            except OSError as e:
+                print(f"Could not checkpoint noise profile: {e}")
+
+    def verify(self, lengths: list):
+        """Check every chunk is on disk with its expected length before the output is written."""
+        if not self.enabled:
+            return
+        missing = []
+        for i, length in enumerate(lengths):
+            try:
+                n = len(np.load(self._chunk_path(i), mmap_mode="r", allow_pickle=False))
+            except (OSError, ValueError):
+                n = None
+            if n != length:
+                missing.append(i)
+        if missing:
+            raise IncompleteCheckpoint(f"{self.work_dir}: chunks {missing[:10]} missing or truncated")
+
+
+def discard(out_path: str):
+    """Remove the work directory kept for out_path, if any."""
+    work_dir = work_dir_for(out_path)
+    if os.path.isdir(work_dir):
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def checkpoint_for(file_path: str, out_path: str, params: dict, seconds: float, kind: str, layout: dict):
+    """A Checkpoint if params["checkpoint_seconds"] is set and the file is at least that long, else None."""
+    threshold = params.get("checkpoint_seconds")
+    if threshold is None or not seconds or seconds < threshold:
+        return None
+    try:
+        return Checkpoint(file_path, out_path, params, kind, layout)
+    except OSError as e:
+        print(f"Checkpointing unavailable for {file_path}: {e}")
+        return None
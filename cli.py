@@ -0,0 +1,352 @@
+"""Headless batch front-end for the noise reduction engine.
+
+Usage:
+    python cli.py recordings/*.wav other.mp3 --manifest list.txt --jobs 8
+"""
+import argparse
+import glob
+import os
+import signal
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+import engine
+import filters
+from metrics import PROFILERS, JobMetrics, RunReport
+from result_cache import CACHE_DIR, DEFAULT_MAX_BYTES, ResultCache
+from scheduler import JobScheduler, POLICIES
+from settings import CHECKPOINT_SECONDS, NOISE_SCAN_SECONDS
+from watcher import AUDIO_EXTS, STABLE_SECONDS, FolderWatcher, is_cleaned_output, output_is_current
+
+
+def read_manifest(path: str) -> list:
+    """One input path per line; blank lines and '#' comments are ignored."""
+    base = os.path.dirname(os.path.abspath(path))
+    items = []
+    with open(path, "r", encoding="utf-8") as fh:
+        for line in fh:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            items.append(line if os.path.isabs(line) else os.path.join(base, line))
+    return items
+
+
+def collect_inputs(patterns: list, manifests: list) -> list:
+    """Expand files, globs, directories and manifests into a de-duplicated list."""
+    candidates = []
+    for m in manifests or []:
+        candidates.extend(read_manifest(m))
+    for pat in patterns or []:
+        if os.path.isdir(pat):
+            candidates.extend(sorted(os.path.join(pat, n) for n in os.listdir(pat)))
+            continue
+        matches = sorted(glob.glob(pat, recursive=True))
+        candidates.extend(matches if matches else [pat])
+
+    seen = set()
+    files = []
+    for path in candidates:
+        path = os.path.abspath(path)
+        if path in seen or not path.lower().endswith(AUDIO_EXTS):
+            continue
+        if is_cleaned_output(path):
+            continue
+        seen.add(path)
+        files.append(path)
+    return files
+
+
+def _output_for(path: str, output_dir: str) -> str:
+    out = engine.get_output_path(path)
+    if output_dir:
+        out = os.path.join(output_dir, os.path.basename(out))
+    return out
+
+
+def _run_job(path: str, out_path: str, params: dict, profiler: str = None, profile_dir: str = None):
+    """Worker entry point; must stay top-level so it can be pickled.
+
+    Returns (path, out_path, error, metrics row).
+    """
+    m = JobMetrics(path, profiler=profiler, profile_dir=profile_dir)
+    try:
+        with m.job():
+            engine.process_file(path, out_path, params, metrics=m)
+        return path, out_path, None, m.to_dict()
+    except Exception as e:
+        return path, out_path, f"{type(e).__name__}: {e}", m.to_dict()
+
+
+def _describe(row: dict) -> str:
+    text = f"{row['wall_s']:.1f}s"
+    if row.get("rtf") is not None:
+        text += f", RTF {row['rtf']:.3f}"
+    return text
+
+
+def _take_cached(files: list, args, params: dict, cache, report: RunReport) -> tuple:
+    """Serve cache hits straight away; returns (misses, {path: cache key})."""
+    if cache is None:
+        return files, {}
+    misses, keys = [], {}
+    for f in files:
+        out_path = _output_for(f, args.output_dir)
+        m = JobMetrics(f)
+        with m.job():
+            try:
+                with m.stage("cache"):
+                    keys[f] = cache.key(f, params, out_path)
+                    m.cache_hit = cache.fetch(keys[f], out_path)
+            except OSError:
+                pass
+        if m.cache_hit:
+            report.add(m)
+            print(f"Cached: {f} -> {out_path}")
+        else:
+            misses.append(f)
+    return misses, keys
+
+
+def _record_result(result: tuple, sched, report: RunReport, cache, keys: dict) -> bool:
+    """Book-keeping for one finished _run_job; returns True if it failed."""
+    path, out_path, err, row = result
+    sched.finish(path)
+    report.add(row)
+    if err:
+        print(f"FAILED {path}: {err}", file=sys.stderr)
+        return True
+    if path in keys:
+        engine.store_result(cache, keys[path], out_path)
+    print(f"Done: {path} -> {out_path} ({_describe(row)})")
+    return False
+
+
+def _finish_report(report: RunReport, path: str):
+    if path:
+        report.write(path)
+        print(f"Report written to {path}")
+
+
+def _run_pipeline(files: list, args, params: dict, cache) -> int:
+    params["chunk_workers"] = args.chunk_workers or os.cpu_count() or 1
+    t0 = time.perf_counter()
+    report = RunReport()
+    todo, keys = _take_cached(files, args, params, cache, report)
+    print(f"Pipelined run of {len(todo)} file(s), {params['chunk_workers']} chunk worker(s)")
+    failed = []
+
+    def on_result(path, out_path, err):
+        if err:
+            failed.append(path)
+            print(f"FAILED {path}: {type(err).__name__}: {err}", file=sys.stderr)
+            return
+        if path in keys:
+            engine.store_result(cache, keys[path], out_path)
+        print(f"Done: {path} -> {out_path}")
+
+    engine.process_batch([(f, _output_for(f, args.output_dir)) for f in todo], params, on_result,
+                         report=report)
+    print(f"{len(files) - len(failed)}/{len(files)} succeeded in {time.perf_counter() - t0:.1f}s")
+    if cache is not None:
+        print(cache.summary())
+    _finish_report(report, args.report)
+    return 1 if failed else 0
+
+
+def _interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+def _run_watch(args, params: dict, cache) -> int:
+    """Process new files landing in the input folders until interrupted."""
+    folders = [p for p in args.inputs if os.path.isdir(p)]
+    if not folders or len(folders) != len(args.inputs) or args.manifest:
+        print("--watch takes one or more directories.", file=sys.stderr)
+        return 2
+    jobs = max(1, args.jobs)
+    params["chunk_workers"] = args.chunk_workers or max(1, (os.cpu_count() or 1) // jobs)
+    params["concurrent_jobs"] = jobs
+
+    def processed(path):
+        return output_is_current(path, _output_for(path, args.output_dir))
+
+    watcher = FolderWatcher(folders, processed, stable_seconds=args.stable_seconds,
+                            use_inotify=False if args.poll else None).start()
+    print(f"Watching {', '.join(watcher.folders)} ({watcher.mode}, {jobs} worker(s)); Ctrl+C to stop")
+
+    budget = args.memory_budget * 1024 ** 2 if args.memory_budget else None
+    sched = JobScheduler(max_concurrent=jobs, memory_budget=budget, policy=args.policy)
+    sched.configure(params)
+    report = RunReport()
+    keys = {}
+    failed = 0
+    # Stop the same way on Ctrl+C and on a service manager's SIGTERM
+    signal.signal(signal.SIGTERM, _interrupt)
+    try:
+        # Workers keep the default SIGTERM so they don't each report an interrupt
+        with ProcessPoolExecutor(max_workers=jobs, initializer=signal.signal,
+                                 initargs=(signal.SIGTERM, signal.SIG_DFL)) as pool:
+            running = set()
+            while True:
+                # Backpressure: only take as many files as there are free worker slots
+                room = jobs - sched.running_count - sched.pending_count
+                if room > 0:
+                    todo, new_keys = _take_cached(watcher.take(room), args, params, cache, report)
+                    keys.update(new_keys)
+                    for f in todo:
+                        sched.submit(f)
+                for f in sched.take_ready():
+                    running.add(pool.submit(_run_job, f, _output_for(f, args.output_dir), params,
+                                            args.profile, args.profile_dir))
+                if not running:
+                    watcher.wait(timeout=1.0)
+                    continue
+                done, running = wait(running, timeout=1.0, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    failed += _record_result(fut.result(), sched, report, cache, keys)
+    except KeyboardInterrupt:
+        print("Stopped watching.")
+    finally:
+        watcher.stop()
+    if cache is not None:
+        print(cache.summary())
+    _finish_report(report, args.report)
+    return 1 if failed else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(description="Batch noise reduction without a GUI.")
+    p.add_argument("inputs", nargs="*", help="Audio files, directories or glob patterns.")
+    p.add_argument("-m", "--manifest", action="append", default=[],
+                   help="Text file listing one input per line (repeatable).")
+    p.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                   help="Worker processes (default: number of cores).")
+    p.add_argument("-o", "--output-dir", default=None,
+                   help="Write outputs here instead of next to the inputs.")
+    p.add_argument("--memory-budget", type=int, default=None, metavar="MB",
+                   help="Max estimated decoded audio in flight (default: a quarter of RAM).")
+    p.add_argument("--policy", choices=POLICIES, default="fifo",
+                   help="Order in which queued files are admitted.")
+    p.add_argument("--stream", action="store_true",
+                   help="Process block by block so memory stays flat for long recordings.")
+    p.add_argument("--block-seconds", type=float, default=engine.STREAM_BLOCK_SECONDS,
+                   help="Block length for --stream (default: %(default)s).")
+    p.add_argument("--chunk-workers", type=int, default=None,
+                   help="Processes per file for chunk-level parallelism "
+                        "(default: spare cores divided across running files).")
+    p.add_argument("--noise-profile", default=None, metavar="PATH",
+                   help="Use one noise profile for every file: a saved .npz, or a reference "
+                        "recording whose first seconds are pure room/mic noise.")
+    p.add_argument("--noise-window", choices=("auto", "head"), default="auto",
+                   help="Where each file's noise profile is taken from: the quietest steady stretch "
+                        "of the file (default) or its first seconds.")
+    p.add_argument("--noise-scan-seconds", type=float, default=NOISE_SCAN_SECONDS, metavar="S",
+                   help="With --noise-window auto, search this much of each file's start (default: %(default)s).")
+    p.add_argument("--reduced-rate", action="store_true",
+                   help="Denoise at the lowest rate that keeps the lowpass passband (e.g. 24 kHz).")
+    p.add_argument("--keep-reduced-rate", action="store_true",
+                   help="With --reduced-rate, write at the reduced rate instead of the source rate.")
+    p.add_argument("--filter", choices=filters.MODES, default="zerophase", dest="filter_mode",
+                   help="Lowpass stage: zero-phase SOS (default), causal SOS or linear-phase FIR.")
+    p.add_argument("--pipeline", action="store_true",
+                   help="One process with overlapped decode/denoise/write stages; chunks of each "
+                        "file are spread over all cores. Best on slow network storage.")
+    p.add_argument("--no-cache", action="store_true",
+                   help="Always reprocess; don't read or write the result cache.")
+    p.add_argument("--cache-dir", default=CACHE_DIR, help="Result cache location (default: %(default)s).")
+    p.add_argument("--cache-size", type=int, default=DEFAULT_MAX_BYTES // 1024 ** 2, metavar="MB",
+                   help="Evict least recently used results beyond this size (default: %(default)s).")
+    p.add_argument("--no-profile-cache", action="store_true",
+                   help="Don't read or write cached per-file noise profiles.")
+    p.add_argument("--checkpoint-seconds", type=float, default=CHECKPOINT_SECONDS, metavar="S",
+                   help="Save finished chunks of files at least this long next to the output, so an "
+                        "interrupted run resumes where it stopped (default: %(default)s).")
+    p.add_argument("--no-checkpoint", action="store_true",
+                   help="Never checkpoint; interrupted files start over.")
+    p.add_argument("--report", default=None, metavar="PATH",
+                   help="Write per-file stage timings, CPU time, peak RSS and real-time factor "
+                        "to PATH (.csv, otherwise JSON).")
+    p.add_argument("--profile", choices=PROFILERS, default=None,
+                   help="Profile each job with cProfile (.prof) or pyinstrument (.html).")
+    p.add_argument("--profile-dir", default="profiles",
+                   help="Where --profile output goes (default: %(default)s).")
+    p.add_argument("--watch", action="store_true",
+                   help="Keep running and clean new recordings as they land in the input directories.")
+    p.add_argument("--stable-seconds", type=float, default=STABLE_SECONDS,
+                   help="With --watch, a file must stop changing for this long before it is processed "
+                        "(default: %(default)s).")
+    p.add_argument("--poll", action="store_true",
+                   help="With --watch, poll instead of using inotify (needed for most network shares).")
+    return p
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    files = [] if args.watch else collect_inputs(args.inputs, args.manifest)
+    if not files and not args.watch:
+        print("No input files.", file=sys.stderr)
+        return 2
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    params = engine.default_params()
+    params["streaming"] = args.stream
+    params["block_seconds"] = args.block_seconds
+    params["reduced_rate"] = args.reduced_rate
+    params["filter_mode"] = args.filter_mode
+    params["noise_window"] = args.noise_window
+    params["noise_scan_seconds"] = args.noise_scan_seconds
+    params["restore_rate"] = not args.keep_reduced_rate
+    params["checkpoint_seconds"] = None if args.no_checkpoint else args.checkpoint_seconds
+    if args.no_profile_cache:
+        params["profile_cache_dir"] = None
+    if args.noise_profile:
+        if args.noise_profile.lower().endswith(".npz"):
+            params["noise_profile"] = os.path.abspath(args.noise_profile)
+        else:
+            params["noise_profile"] = engine.make_profile(args.noise_profile, params)
+        print(f"Using noise profile {params['noise_profile']}")
+    cache = None if args.no_cache else ResultCache(args.cache_dir, args.cache_size * 1024 ** 2)
+    if args.watch:
+        return _run_watch(args, params, cache)
+    if args.pipeline:
+        return _run_pipeline(files, args, params, cache)
+
+    t0 = time.perf_counter()
+    report = RunReport()
+    todo, keys = _take_cached(files, args, params, cache, report)
+    jobs = max(1, min(args.jobs, len(todo)))
+    params["chunk_workers"] = args.chunk_workers or max(1, (os.cpu_count() or 1) // jobs)
+    params["concurrent_jobs"] = jobs
+    print(f"Processing {len(todo)} file(s) with {jobs} worker(s), "
+          f"{params['chunk_workers']} chunk worker(s) each")
+
+    budget = args.memory_budget * 1024 ** 2 if args.memory_budget else None
+    sched = JobScheduler(max_concurrent=jobs, memory_budget=budget, policy=args.policy)
+    sched.configure(params)
+    for f in todo:
+        sched.submit(f)
+
+    failed = 0
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        running = set()
+        while not sched.is_idle():
+            for f in sched.take_ready():
+                running.add(pool.submit(_run_job, f, _output_for(f, args.output_dir), params,
+                                        args.profile, args.profile_dir))
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            for fut in done:
+                failed += _record_result(fut.result(), sched, report, cache, keys)
+
+    total = time.perf_counter() - t0
+    print(f"{len(files) - failed}/{len(files)} succeeded in {total:.1f}s")
+    if cache is not None:
+        print(cache.summary())
+    _finish_report(report, args.report)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,564 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing, nullcontext
+import soundfile as sf
+import numpy as np
+
+import checkpoint
+import chunker
+import filters
+import noise_window
+import resampling
+from metrics import JobMetrics, SharedPeak, stage
+from pipeline import AsyncWriter, JobCancelled, atomic_output, prefetch
+from noise_profile import NoiseProfile, PROFILE_DIR, get_profile, hop_length, profile_key
+# Re-exported so callers can keep using engine.<name>
+from result_cache import process_cached, store_result  # noqa: F401
+from settings import (CROSSFADE_SECONDS, FILTER_ORDER, LOWPASS_HZ, NOISE_SCAN_SECONDS, NOISE_SECONDS,  # noqa: F401
+                      OVERLAP_SECONDS, STATIONARY_ARGS, STREAM_BLOCK_SECONDS, default_params, get_output_path)
+
+
+def lowpass(y: np.ndarray, sr: int, cutoff_hz: float = LOWPASS_HZ, order: int = FILTER_ORDER,
+            mode: str = "zerophase") -> np.ndarray:
+    """Lowpass an in-memory signal block by block; the result is float32 and the same length.
+
+    A channels × samples array is filtered one channel at a time.
+    """
+    if y.ndim == 2:
+        return np.stack([lowpass(ch, sr, cutoff_hz, order, mode) for ch in y])
+    return filters.apply(y, filters.make_lowpass(sr, cutoff_hz, order, mode))
+
+
+def work_rate(sr: int, params: dict) -> int:
+    """Rate the denoise/filter stages run at for a source of rate `sr`."""
+    if not params.get("reduced_rate"):
+        return sr
+    return resampling.processing_rate(sr, params["cutoff_hz"])
+
+
+def noise_profile_for(file_path: str, noise_part: np.ndarray, sr: int, params: dict,
+                      stationary_args: dict = None, channel: int = None, offset: int = 0) -> NoiseProfile:
+    """The shared profile from params["noise_profile"] if set, else this file's (cached) one.
+
+    `channel` is the channel of a multichannel file that noise_part comes from
+    and `offset` where it starts; a shared profile applies to every channel.
+    """
+    stationary_args = stationary_args or params["stationary_args"]
+    if params.get("noise_profile"):
+        profile = NoiseProfile.load(params["noise_profile"])
+        if not profile.matches(sr, stationary_args):
+            raise ValueError(f"Noise profile {params['noise_profile']} was made at sr={profile.sr}, "
+                             f"n_fft={profile.n_fft}; {os.path.basename(file_path)} is sr={sr}")
+        return profile
+    return get_profile(file_path, noise_part, sr, stationary_args, offset=offset,
+                       cache_dir=params.get("profile_cache_dir"), channel=channel)
+
+
+def make_profile(reference_path: str, params: dict = None, out_path: str = None) -> str:
+    """Save the noise profile of a reference recording's head; returns the .npz path."""
+    params = params or default_params()
+    y, src_sr = load_audio(reference_path, duration=max(params["noise_seconds"], 1.0) + 0.1, mono=True)
+    sr = work_rate(src_sr, params)
+    y = resampling.resample(y, src_sr, sr)
+    stationary_args = resampling.scale_stationary_args(params["stationary_args"], src_sr, sr)
+    noise_part = y[0:int(params["noise_seconds"] * sr)] if len(y) > sr else y
+    profile = NoiseProfile.from_signal(noise_part, sr, stationary_args)
+    if not out_path:
+        key = profile_key(reference_path, 0, len(noise_part), sr, stationary_args)
+        out_path = os.path.join(params.get("profile_cache_dir") or PROFILE_DIR, key + ".npz")
+    profile.save(out_path)
+    return out_path
+
+
+def open_soundfile(file_path: str):
+    """sf.SoundFile for reading, or None if libsndfile can't decode the format.
+
+    I/O problems (missing file, no permission) raise the real OSError instead
+    of being mistaken for an unsupported format.
+    """
+    try:
+        return sf.SoundFile(file_path)
+    except sf.LibsndfileError as e:
+        if e.code != 2:  # SF_ERR_SYSTEM; everything else is about the format
+            return None
+        open(file_path, "rb").close()  # raises FileNotFoundError, PermissionError, ...
+        raise
+
+
+def load_audio(file_path: str, duration: float = None, mono: bool = False):
+    """Float32 samples as a channels × samples array, and the rate; `mono` downmixes to 1-D.
+
+    Decodes through soundfile when it can; librosa (and the numba stack behind
+    it) is only imported for formats libsndfile can't open, e.g. M4A.
+    """
+    f = open_soundfile(file_path)
+    if f is None:
+        import librosa
+        y, sr = librosa.load(file_path, sr=None, duration=duration, mono=mono)
+        return (y if mono else np.atleast_2d(y)), sr
+    with f:
+        frames = -1 if duration is None else int(duration * f.samplerate)
+        y = f.read(frames, dtype="float32", always_2d=True)
+        if mono:
+            return (y.mean(axis=1) if y.shape[1] > 1 else y[:, 0]), f.samplerate
+        return np.ascontiguousarray(y.T), f.samplerate
+
+
+def open_decoder(file_path: str):
+    """Return (sr, total_frames, channels, blocks) where blocks(n) yields float32 blocks of n frames.
+
+    Blocks are 1-D for mono files and frames × channels otherwise. Uses
+    soundfile's block reader when libsndfile can open the file and falls back
+    to audioread (ffmpeg/gstreamer) for everything else, e.g. M4A.
+    """
+    f = open_soundfile(file_path)
+    if f is None:
+        return _open_audioread(file_path)
+
+    def blocks(block_frames: int):
+        # f.read rather than f.blocks: for MP3 the header's frame count can run
+        # past the decodable audio, and blocks() would pad with uninitialised memory
+        with f:
+            while True:
+                b = f.read(block_frames, dtype="float32", always_2d=True)
+                if not len(b):
+                    return
+                yield b if b.shape[1] > 1 else b[:, 0]
+
+    return f.samplerate, f.frames, f.channels, blocks
+
+
+def _open_audioread(file_path: str):
+    import audioread
+    f = audioread.audio_open(file_path)
+    sr, channels = f.samplerate, f.channels
+
+    def blocks(block_frames: int):
+        pending, n = [], 0
+        with f:
+            for buf in f:
+                x = np.frombuffer(buf, "<i2").astype(np.float32) / 32768.0
+                pending.append(x.reshape(-1, channels) if channels > 1 else x)
+                n += len(pending[-1])
+                while n >= block_frames:
+                    joined = np.concatenate(pending)
+                    yield joined[:block_frames]
+                    pending = [joined[block_frames:]]
+                    n = len(pending[0])
+            if n:
+                yield np.concatenate(pending)
+
+    return sr, int(f.duration * sr), channels, blocks
+
+
+def wants_noise_window(params: dict) -> bool:
+    """Whether profiles come from an automatically chosen window (see noise_window.py)."""
+    return params.get("noise_window", "auto") == "auto" and not params.get("noise_profile")
+
+
+def scan_limit(sr: int, params: dict, streaming: bool = False) -> int:
+    """Frames at the start of a file the noise window is searched in; -1 for the whole file.
+
+    Streaming jobs buffer what they scan, so for them a whole-file scan
+    (noise_scan_seconds None) is clamped to NOISE_SCAN_SECONDS.
+    """
+    seconds = params.get("noise_scan_seconds")
+    if seconds is None and streaming:
+        seconds = NOISE_SCAN_SECONDS
+    return -1 if seconds is None else max(int(seconds * sr), 1)
+
+
+def chosen_window(scanner, params: dict, metrics=None):
+    """A finished Scanner's window in its own frames, recorded in metrics.extra; None for files of a second or less."""
+    if scanner.samples <= scanner.sr:
+        return None  # short files are profiled whole, see noise_sample
+    start, end = scanner.window(params["noise_seconds"])
+    if metrics is not None:
+        metrics.extra["noise_start_s"] = round(start / scanner.sr, 3)
+        metrics.extra["noise_end_s"] = round(end / scanner.sr, 3)
+    return start, end
+
+
+def find_noise_window(file_path: str, params: dict, y: np.ndarray = None, sr: int = None, metrics=None):
+    """Source-rate (start, end) frames the noise profiles are taken from, or None for the file's head.
+
+    Only the first params["noise_scan_seconds"] are scanned: of `y`
+    (channels × samples at rate `sr`) when given, else read from the file.
+    Returns None unless wants_noise_window(params).
+    """
+    if not wants_noise_window(params):
+        return None
+    with stage(metrics, "scan"):
+        if y is not None:
+            scanner = noise_window.Scanner(sr)
+            limit = scan_limit(sr, params)
+            scanner.feed(noise_window.downmix(y[:, :limit] if limit > 0 else y))
+        else:
+            sr, _, _, blocks = open_decoder(file_path)
+            scanner = noise_window.Scanner(sr)
+            limit = scan_limit(sr, params)
+            with closing(blocks(max(int(params["block_seconds"] * sr), 1))) as source:
+                for b in source:
+                    left = limit - scanner.samples if limit > 0 else len(b)
+                    scanner.feed(noise_window.downmix(b[:left].T))
+                    if limit > 0 and scanner.samples >= limit:
+                        break
+    return chosen_window(scanner, params, metrics)
+
+
+def noise_sample(y: np.ndarray, sr: int, params: dict, window=None, src_sr: int = None):
+    """The part of y (channels × samples at the working rate) profiles are estimated from, and its offset.
+
+    `window` is find_noise_window's choice in src_sr frames; without one the
+    first noise_seconds are used. Signals of a second or less are used whole.
+    """
+    length = int(params["noise_seconds"] * sr)
+    if y.shape[-1] <= sr:
+        return y, 0
+    start = 0
+    if window is not None:
+        start = min(int(round(window[0] * sr / src_sr)), max(0, y.shape[-1] - length))
+    return y[:, start:start + length], start
+
+
+def decode(file_path: str, params: dict, metrics=None) -> dict:
+    """Decode stage: load the file (channels × samples), pick its noise window and bring it to the working rate."""
+    with stage(metrics, "decode"):
+        y, src_sr = load_audio(file_path)
+    window = find_noise_window(file_path, params, y, src_sr, metrics)
+    with stage(metrics, "decode"):
+        sr = work_rate(src_sr, params)
+        y = resampling.resample(y, src_sr, sr)
+    if metrics is not None:
+        metrics.audio_seconds = y.shape[-1] / sr
+    return {"file_path": file_path, "y": y, "sr": sr, "src_sr": src_sr, "noise_window": window}
+
+
+def _job_profiles(file_path, noise_part, sr, params, stationary_args, ckpt, offset: int = 0) -> list:
+    """One noise_profile_for per row of noise_part, reusing the copies an interrupted run checkpointed."""
+    channels = len(noise_part)
+    profiles = []
+    for c in range(channels):
+        profile = ckpt.load_profile(c) if ckpt else None
+        if profile is None or not profile.matches(sr, stationary_args):
+            profile = noise_profile_for(file_path, noise_part[c], sr, params, stationary_args,
+                                        c if channels > 1 else None, offset)
+            if ckpt:
+                ckpt.save_profile(profile, c)
+        profiles.append(profile)
+    return profiles
+
+
+def _channel_workers(params: dict, channels: int) -> int:
+    """Pool size for a job: chunk_workers per channel, capped at this job's share of the cores.
+
+    The share is what is left after params["concurrent_jobs"] files run side
+    by side; an explicit chunk_workers above it is still honoured.
+    """
+    workers = max(1, params["chunk_workers"])
+    if channels == 1:
+        return workers
+    share = max(1, (os.cpu_count() or 1) // max(1, params.get("concurrent_jobs", 1)))
+    return max(workers, min(workers * channels, share))
+
+
+def _note_resumed(metrics, ckpt):
+    if metrics is not None and ckpt is not None and ckpt.resumed:
+        metrics.extra["resumed_chunks"] = ckpt.resumed
+
+
+def denoise(decoded: dict, params: dict, progress=None, should_cancel=None, metrics=None,
+            out_path: str = None) -> np.ndarray:
+    """Denoise stage: noise profiles, overlap-add reduction and lowpass, all at the working rate.
+
+    Every channel gets its own noise profile and the channels' chunks share
+    one process pool, so a stereo file takes about as long as a mono one on a
+    machine with cores to spare. With `out_path`, long files are checkpointed
+    next to it (see checkpoint.py) and a previous interrupted run's chunks are
+    reused.
+    """
+    file_path, y, sr = decoded["file_path"], decoded["y"], decoded["sr"]
+    stationary_args = resampling.scale_stationary_args(params["stationary_args"], decoded["src_sr"], sr)
+    channels, length = y.shape
+
+    # CAPTURE NOISE PROFILE
+    # We take a slightly longer sample (0.8s) for better accuracy, from the window decode picked
+    noise_part, offset = noise_sample(y, sr, params, decoded.get("noise_window"), decoded["src_sr"])
+
+    workers = max(1, params["chunk_workers"])
+    # At least one chunk per worker; overlap-add context keeps the seams inaudible
+    n_chunks = max(8, workers, min(50, int(length / 300000) + 8))
+    ckpt = None
+    if out_path:
+        ckpt = checkpoint.checkpoint_for(file_path, out_path, params, length / sr, "memory",
+                                         {"sr": sr, "length": length, "channels": channels, "n_chunks": n_chunks})
+        if ckpt:
+            n_chunks = ckpt.layout["n_chunks"]  # an earlier run's split, so its chunks line up
+    with stage(metrics, "profile"):
+        profiles = _job_profiles(file_path, noise_part, sr, params, stationary_args, ckpt, offset)
+    with stage(metrics, "denoise"):
+        reduced_full = chunker.overlap_add(y if channels > 1 else y[0], sr,
+                                           profiles if channels > 1 else profiles[0], stationary_args, n_chunks,
+                                           overlap=int(params["overlap_seconds"] * sr),
+                                           crossfade=int(params["crossfade_seconds"] * sr),
+                                           workers=_channel_workers(params, channels), progress=progress,
+                                           should_cancel=should_cancel, checkpoint=ckpt)
+    _note_resumed(metrics, ckpt)
+    if reduced_full is None:
+        raise JobCancelled(file_path)
+
+    with stage(metrics, "filter"):
+        return lowpass(reduced_full, sr, params["cutoff_hz"], params["filter_order"],
+                       params.get("filter_mode", "zerophase"))
+
+
+def encode(out_path: str, y: np.ndarray, sr: int, out_sr: int, metrics=None) -> str:
+    """Write stage: resample to the output rate and write via a temp file + atomic rename.
+
+    `y` is mono or channels × samples. Any checkpoint kept for this output is
+    dropped once it is in place.
+    """
+    with stage(metrics, "encode"):
+        y = resampling.resample(y, sr, out_sr)
+        with atomic_output(out_path) as tmp:
+            sf.write(tmp, y.T, out_sr)
+        checkpoint.discard(out_path)
+    return out_path
+
+
+def output_rate(decoded: dict, params: dict) -> int:
+    return decoded["src_sr"] if params.get("restore_rate", True) else decoded["sr"]
+
+
+def process_file(file_path: str, out_path: str = None, params: dict = None,
+                 progress=None, should_cancel=None, metrics=None) -> str:
+    """Denoise, lowpass and write one file. Returns the output path.
+
+    `progress(fraction)` is called after every chunk and `should_cancel()` is
+    polled while chunks run; a truthy result raises JobCancelled. Set
+    params["chunk_workers"] above 1 to spread one file's chunks over processes.
+    The output only appears, atomically, once it has been written completely.
+    Pass a metrics.JobMetrics to collect per-stage timings.
+    """
+    params = params or default_params()
+    out_path = out_path or get_output_path(file_path)
+    if params.get("streaming"):
+        return _process_streaming(file_path, out_path, params, progress, should_cancel, metrics)
+
+    decoded = decode(file_path, params, metrics)
+    reduced = denoise(decoded, params, progress, should_cancel, metrics, out_path)
+    return encode(out_path, reduced, decoded["sr"], output_rate(decoded, params), metrics)
+
+
+def process_batch(jobs, params: dict = None, on_result=None, should_cancel=None, report=None):
+    """Run [(in_path, out_path)] through decode -> denoise -> write stages on separate threads.
+
+    File N+1 is decoded while file N is denoised, and file N-1 is written in
+    the background; bounded queues keep at most one file waiting per stage.
+    `on_result(in_path, out_path, error)` is called once per job (error is
+    None on success), possibly from the writer thread. With a RunReport, each
+    job's stage timings are added to it; a job's wall time and peak RSS then
+    run from the start of its decode to the end of its write.
+    """
+    params = params or default_params()
+    on_result = on_result or (lambda *_: None)
+    if params.get("streaming"):
+        # Streaming jobs already overlap their own stages block by block
+        for in_path, out_path in jobs:
+            m = JobMetrics(in_path) if report is not None else None
+            try:
+                with m.job() if m else nullcontext():
+                    process_file(in_path, out_path, params, should_cancel=should_cancel, metrics=m)
+                on_result(in_path, out_path, None)
+            except JobCancelled:
+                raise
+            except Exception as e:
+                on_result(in_path, out_path, e)
+            finally:
+                if m:
+                    report.add(m)
+        return
+
+    peaks = SharedPeak()
+
+    def finish(m, in_path, out_path, err):
+        if m is not None:
+            m.wall = time.perf_counter() - m.extra.pop("_t0")
+            m.cpu = sum(s["cpu"] for s in m.stages.values())
+            m.status = "error" if err else "done"
+            peaks.end(m)
+            report.add(m)
+        on_result(in_path, out_path, err)
+
+    def decoded_jobs():
+        for in_path, out_path in jobs:
+            m = JobMetrics(in_path) if report is not None else None
+            if m is not None:
+                m.extra["_t0"] = time.perf_counter()
+                peaks.start(m)
+            try:
+                yield in_path, out_path, m, decode(in_path, params, m), None
+            except Exception as e:
+                yield in_path, out_path, m, None, e
+
+    def write(item):
+        in_path, out_path, m, y, sr, out_sr = item
+        try:
+            encode(out_path, y, sr, out_sr, m)
+            finish(m, in_path, out_path, None)
+        except Exception as e:
+            finish(m, in_path, out_path, e)
+
+    with AsyncWriter(write, maxsize=1) as writer, closing(prefetch(decoded_jobs(), maxsize=1)) as queued:
+        for in_path, out_path, m, decoded, err in queued:
+            if err is not None:
+                finish(m, in_path, out_path, err)
+                continue
+            try:
+                reduced = denoise(decoded, params, should_cancel=should_cancel, metrics=m, out_path=out_path)
+            except JobCancelled:
+                raise
+            except Exception as e:
+                finish(m, in_path, out_path, e)
+                continue
+            writer.write((in_path, out_path, m, reduced, decoded["sr"], output_rate(decoded, params)))
+            del decoded, reduced
+
+
+def _process_streaming(file_path: str, out_path: str, params: dict, progress, should_cancel, metrics=None) -> str:
+    """Block-by-block variant of process_file whose peak memory doesn't grow with file length.
+
+    The noise window is searched for while the first noise_scan_seconds are
+    decoded (never the whole file, see scan_limit) and chunks wait until it
+    is known; without
+    one the profiles come from the head of the first block. Blocks are regrouped into block_seconds chunks that are denoised
+    with hop-aligned context and crossfaded like the in-memory path (see
+    chunker.StreamOverlapAdd), so there are no seams at block boundaries. The
+    lowpass is a streaming filter stage (see filters.py) whose state carries
+    across blocks. The channels of a multichannel chunk are denoised side by
+    side on a small process pool. Long files keep each chunk's denoised
+    samples in a checkpoint; a resumed run still decodes, filters and writes
+    every block but skips denoising the saved chunks.
+    """
+    src_sr, total, channels, blocks = open_decoder(file_path)
+    if metrics is not None and total:
+        metrics.audio_seconds = total / src_sr
+    block_frames = max(int(params["block_seconds"] * src_sr), 1)
+    sr = work_rate(src_sr, params)
+    out_sr = src_sr if params.get("restore_rate", True) else sr
+    stationary_args = resampling.scale_stationary_args(params["stationary_args"], src_sr, sr)
+    down = resampling.BlockResampler(src_sr, sr, channels)
+    up = resampling.BlockResampler(sr, out_sr, channels)
+    ckpt = checkpoint.checkpoint_for(file_path, out_path, params, total / src_sr, "streaming",
+                                     {"sr": sr, "block_frames": block_frames, "channels": channels})
+    stream = chunker.StreamOverlapAdd(channels, max(int(params["block_seconds"] * sr), 1),
+                                      overlap=int(params["overlap_seconds"] * sr),
+                                      crossfade=int(params["crossfade_seconds"] * sr),
+                                      hop=hop_length(stationary_args))
+    saved = ckpt.completed() if ckpt else set()
+    lengths = []
+    scanner = noise_window.Scanner(src_sr) if wants_noise_window(params) else None
+    limit = scan_limit(src_sr, params, streaming=True)
+
+    def work_blocks():
+        source = iter(blocks(block_frames))
+        while True:
+            with stage(metrics, "decode"):
+                b = next(source, None)
+                out_block = down.process(b) if b is not None else down.flush()
+            if scanner is not None and b is not None and scanner.samples < limit:
+                with stage(metrics, "scan"):
+                    scanner.feed(noise_window.downmix(b[:limit - scanner.samples].T))
+            yield (len(b) if b is not None else 0), out_block
+            if b is None:
+                return
+
+    def write_block(b):
+        with stage(metrics, "encode"):
+            out.write(up.process(b))
+
+    def join(rows):
+        return np.stack(rows, axis=1) if channels > 1 else rows[0]
+
+    lps = [filters.make_lowpass(sr, params["cutoff_hz"], params["filter_order"], params.get("filter_mode", "zerophase"))
+           for _ in range(channels)]
+
+    def run(chunks):
+        """Denoise (or reload) each chunk's rows, crossfade them in and pass the final samples on."""
+        for chunk in chunks:
+            first = chunk["index"] * channels
+            length = chunk["hi"] - chunk["lo"]
+            lengths.extend([length] * channels)
+            segs = [ckpt.load(first + c, length) if first + c in saved else None for c in range(channels)]
+            todo = [c for c in range(channels) if segs[c] is None]
+            with stage(metrics, "denoise"):
+                rows = chunk["ctx"]
+                if pool:
+                    futures = {c: pool.submit(chunker.reduce_chunk, rows[c], sr, profiles[c], stationary_args)
+                               for c in todo}
+                    reduced = {c: futures[c].result() for c in todo}
+                else:
+                    reduced = {c: chunker.reduce_chunk(rows[c], sr, profiles[c], stationary_args) for c in todo}
+                for c in todo:
+                    segs[c] = stream.segment(chunk, reduced[c])
+            if ckpt:
+                for c in todo:
+                    ckpt.save(first + c, segs[c])
+            final = stream.add(chunk, segs)
+            with stage(metrics, "filter"):
+                writer.write(join([lp.process(r) for lp, r in zip(lps, final)]))
+
+    def job_profiles(head):
+        """Profiles from the noise window (or first block) among the work-rate blocks decoded so far."""
+        if scanner is None:
+            window, audio = None, head[0]
+        else:
+            window, audio = chosen_window(scanner, params, metrics), np.concatenate(head, axis=1)
+        noise_part, offset = noise_sample(audio, sr, params, window, src_sr)
+        with stage(metrics, "profile"):
+            return _job_profiles(file_path, noise_part, sr, params, stationary_args, ckpt, offset)
+
+    profiles = None
+    head = []  # decoded rows kept until the profiles exist
+    held = []  # chunks planned before then
+    done = 0
+    workers = _channel_workers(params, channels)
+    pool = ProcessPoolExecutor(max_workers=min(workers, channels)) if channels > 1 and workers > 1 else None
+    # Decoding runs ahead on one thread and encoding trails on another, both
+    # through bounded queues, so the denoiser never waits on I/O
+    try:
+        with atomic_output(out_path) as tmp, sf.SoundFile(tmp, "w", samplerate=out_sr, channels=channels) as out:
+            with AsyncWriter(write_block, maxsize=2) as writer, \
+                    closing(prefetch(work_blocks(), maxsize=2)) as decoded:
+                for n_read, block in decoded:
+                    if should_cancel and should_cancel():
+                        raise JobCancelled(file_path)
+                    if len(block) == 0:
+                        continue
+                    rows = block.T if channels > 1 else block[np.newaxis]
+                    held.extend(stream.push(rows))
+                    done += n_read
+                    if profiles is None:
+                        head.append(rows)
+                        if scanner is None or limit <= done:
+                            profiles, head = job_profiles(head), None
+                    if profiles is not None:
+                        run(held)
+                        held = []
+
+                    if progress and total:
+                        progress(min(1.0, done / total))
+                if profiles is None and head:
+                    profiles = job_profiles(head)
+                run(held + stream.finish())
+                if ckpt:
+                    ckpt.verify(lengths)
+                writer.write(join([lp.flush() for lp in lps]))
+            out.write(up.flush())
+    finally:
+        if pool:
+            pool.shutdown(wait=False, cancel_futures=True)
+    _note_resumed(metrics, ckpt)
+    checkpoint.discard(out_path)
+    return out_path
@@ -0,0 +1,243 @@
+"""Queue view that scales to thousands of files.
+
+Per-file state lives in a FileStore of small slotted records. VirtualFileList
+only owns enough row widgets to fill its visible height and re-binds them to
+whichever files are scrolled into view, so adding a 5,000-file folder costs
+5,000 records, not 5,000 sets of frames, labels and images. RecentList keeps
+the sidebar lists up to date one button at a time instead of rebuilding them.
+"""
+import math
+import os
+
+import customtkinter as ctk
+
+ROW_HEIGHT = 80
+ROW_GAP = 8
+CARD_COLOR = "#252525"
+SELECTED_COLOR = "#2C2C2C"
+
+
+class FileState:
+    __slots__ = ("path", "status", "progress", "detail")
+
+    def __init__(self, path: str):
+        self.path = path
+        self.status = "pending"
+        self.progress = None  # None hides the bar
+        self.detail = ""
+
+
+class FileStore:
+    """Insertion-ordered file states with O(1) lookup and lazily rebuilt index access."""
+
+    def __init__(self):
+        self._states = {}
+        self._order = None
+
+    def add(self, path: str) -> bool:
+        if path in self._states:
+            return False
+        self._states[path] = FileState(path)
+        self._order = None
+        return True
+
+    def remove(self, path: str):
+        if self._states.pop(path, None) is not None:
+            self._order = None
+
+    def get(self, path: str):
+        return self._states.get(path)
+
+    def at(self, index: int) -> FileState:
+        if self._order is None:
+            self._order = list(self._states.values())
+        return self._order[index]
+
+    def with_status(self, *statuses) -> list:
+        return [s for s in self._states.values() if s.status in statuses]
+
+    def __contains__(self, path):
+        return path in self._states
+
+    def __len__(self):
+        return len(self._states)
+
+    def __iter__(self):
+        return iter(list(self._states.values()))
+
+
+class _Row:
+    """One reusable card: icon, name, path/detail line, progress bar, preview and remove buttons."""
+
+    def __init__(self, view, icon, close_icon):
+        self.path = None
+        self.frame = ctk.CTkFrame(view.body, corner_radius=12, fg_color=CARD_COLOR, height=ROW_HEIGHT - ROW_GAP)
+        self.frame.pack_propagate(False)
+
+        self.icon_lbl = ctk.CTkLabel(self.frame, image=icon, text="")
+        self.icon_lbl.pack(side="left", padx=(10, 8), pady=10)
+
+        self.remove_btn = ctk.CTkButton(self.frame, text="X", width=28, height=28,
+                                        fg_color="#A63232", hover_color="#8A2727",
+                                        command=lambda: self.path and view.on_remove(self.path))
+        if close_icon:
+            self.remove_btn.configure(image=close_icon, text="")
+        self.remove_btn.pack(side="right", padx=(10, 10), pady=10)
+        if view.on_preview:
+            self.preview_btn = ctk.CTkButton(self.frame, text="Preview", width=70, height=28,
+                                             command=lambda: self.path and view.on_preview(self.path))
+            self.preview_btn.pack(side="right", pady=10)
+
+        center = ctk.CTkFrame(self.frame, fg_color="transparent")
+        center.pack(side="left", fill="both", expand=True, padx=(6, 8), pady=8)
+        self.name_lbl = ctk.CTkLabel(center, text="", anchor="w", font=ctk.CTkFont(size=14, weight="bold"))
+        self.name_lbl.pack(fill="x", anchor="w")
+        self.sub_lbl = ctk.CTkLabel(center, text="", anchor="w", font=ctk.CTkFont(size=10))
+        self.sub_lbl.pack(fill="x", anchor="w", pady=(2, 2))
+        self.progress = ctk.CTkProgressBar(center, width=320)
+        self._progress_shown = False
+
+        for w in (self.frame, self.name_lbl, self.sub_lbl):
+            w.bind("<Button-1>", lambda ev: self.path and view.on_select(self.path))
+
+    def bind(self, state: FileState, selected: bool):
+        if state.path != self.path:
+            self.path = state.path
+            self.name_lbl.configure(text=os.path.basename(state.path))
+        text = f"{state.path}  —  {state.detail}" if state.detail else state.path
+        if self.sub_lbl.cget("text") != text:
+            self.sub_lbl.configure(text=text)
+        self.frame.configure(fg_color=SELECTED_COLOR if selected else CARD_COLOR)
+        if state.progress is None:
+            if self._progress_shown:
+                self.progress.pack_forget()
+                self._progress_shown = False
+        else:
+            if not self._progress_shown:
+                self.progress.pack(fill="x", pady=(2, 4))
+                self._progress_shown = True
+            self.progress.set(state.progress)
+
+
+class VirtualFileList(ctk.CTkFrame):
+    """Scrollable list of FileStore entries that only creates widgets for visible rows."""
+
+    def __init__(self, master, store: FileStore, icon, close_icon, on_remove, on_select, on_preview=None,
+                 title: str = "Files in Queue", **kwargs):
+        super().__init__(master, **kwargs)
+        self.store = store
+        self.icon = icon
+        self.close_icon = close_icon
+        self.on_remove = on_remove
+        self.on_select = on_select
+        self.on_preview = on_preview
+        self.selected = None
+        self.top = 0
+        self._rows = []
+        self._title = title
+
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(1, weight=1)
+        self.title_lbl = ctk.CTkLabel(self, text=title)
+        self.title_lbl.grid(row=0, column=0, columnspan=2, pady=(4, 0))
+        self.body = ctk.CTkFrame(self, fg_color="transparent")
+        self.body.grid(row=1, column=0, sticky="nsew", padx=(12, 0))
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.grid(row=1, column=1, sticky="ns", padx=(0, 4))
+
+        self.body.bind("<Configure>", lambda ev: self._resize(ev.height))
+        for seq in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.bind_all(seq, self._on_wheel, add="+")
+
+    # --- scrolling ---
+    def _visible_rows(self) -> int:
+        return max(1, self.body.winfo_height() // ROW_HEIGHT)
+
+    def _scroll_to(self, top: int):
+        top = max(0, min(int(top), len(self.store) - self._visible_rows()))
+        if top != self.top:
+            self.top = top
+            self.refresh()
+
+    def _on_scrollbar(self, *args):
+        if args[0] == "moveto":
+            self._scroll_to(round(float(args[1]) * len(self.store)))
+        elif args[0] == "scroll":
+            step = int(args[1]) * (self._visible_rows() if args[2] == "pages" else 1)
+            self._scroll_to(self.top + step)
+
+    def _on_wheel(self, ev):
+        # Bound application-wide (like CTkScrollableFrame); only react over this list
+        over = self.winfo_containing(ev.x_root, ev.y_root)
+        if over is None or not str(over).startswith(str(self)):
+            return
+        if getattr(ev, "num", None) == 4:
+            step = -1
+        elif getattr(ev, "num", None) == 5:
+            step = 1
+        else:
+            step = -1 if ev.delta > 0 else 1
+        self._scroll_to(self.top + step)
+
+    # --- rendering ---
+    def _resize(self, height: int):
+        needed = math.ceil(height / ROW_HEIGHT) + 1
+        while len(self._rows) < needed:
+            self._rows.append(_Row(self, self.icon, self.close_icon))
+        self.refresh()
+
+    def refresh(self):
+        """Re-bind every visible row to the store; call after adding, removing or restyling files."""
+        n = len(self.store)
+        self.top = max(0, min(self.top, n - self._visible_rows()))
+        for i, row in enumerate(self._rows):
+            index = self.top + i
+            if index < n:
+                row.bind(self.store.at(index), self.store.at(index).path == self.selected)
+                row.frame.place(x=0, y=i * ROW_HEIGHT, relwidth=1.0)
+            elif row.path is not None:
+                row.path = None
+                row.frame.place_forget()
+        self.title_lbl.configure(text=f"{self._title} ({n})" if n else self._title)
+        if n:
+            self.scrollbar.set(self.top / n, min(1.0, (self.top + self._visible_rows()) / n))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def refresh_path(self, path: str):
+        """Update one file's row if it is on screen; off-screen files cost nothing."""
+        for row in self._rows:
+            if row.path == path:
+                state = self.store.get(path)
+                if state is not None:
+                    row.bind(state, path == self.selected)
+                return
+
+
+class RecentList:
+    """Most-recent-first buttons in a scrollable frame, capped at `limit`, updated incrementally."""
+
+    def __init__(self, frame, on_click, limit: int = 20):
+        self.frame = frame
+        self.on_click = on_click
+        self.limit = limit
+        self._buttons = {}  # path -> button, most recent last
+
+    def add(self, path: str):
+        """Insert path at the top if it isn't listed yet, dropping the oldest beyond the limit."""
+        if path in self._buttons:
+            return
+        btn = ctk.CTkButton(self.frame, text=os.path.basename(path) or path, fg_color="transparent",
+                            hover_color="#2C2C2C", anchor="w", command=lambda p=path: self.on_click(p))
+        first = next(reversed(self._buttons.values()), None)
+        if first is not None:
+            btn.pack(fill="x", pady=4, padx=6, before=first)
+        else:
+            btn.pack(fill="x", pady=4, padx=6)
+        self._buttons[path] = btn
+        while len(self._buttons) > self.limit:
+            oldest = next(iter(self._buttons))
+            self._buttons.pop(oldest).destroy()
+
+    def paths(self) -> list:
+        return list(reversed(self._buttons))
@@ -0,0 +1,165 @@
+"""Run a job in a child process so cancelling it takes effect immediately.
+
+A thread can only notice a cancel between chunks, and one gate call on a long
+chunk runs for tens of seconds. `process_file` here is a drop-in for
+engine.process_file that runs the job in a child process instead and polls
+`should_cancel()` every POLL_SECONDS while relaying progress and stage events.
+On cancel the child's whole process group, including its chunk workers, is
+killed; the call returns (by raising JobCancelled) only after every one of
+them has exited and leftover partial files are gone, so callers can treat it
+as the completion handshake.
+
+Children are forked from a forkserver that has already imported the engine,
+so starting one costs milliseconds rather than an interpreter start-up.
+Process groups are POSIX-only; on Windows the job process itself is
+terminated and its chunk workers exit after their current chunk.
+"""
+import atexit
+import multiprocessing as mp
+import os
+import signal
+import sys
+import threading
+
+from pipeline import JobCancelled, remove_partials
+from settings import default_params, get_output_path
+
+POLL_SECONDS = 0.05
+KILL_GRACE_SECONDS = 1.0
+
+if "forkserver" in mp.get_all_start_methods():
+    _ctx = mp.get_context("forkserver")
+    _ctx.set_forkserver_preload(["engine"])
+else:
+    _ctx = mp.get_context("spawn")
+
+_live = set()
+_live_lock = threading.Lock()
+
+
+def warm_up():
+    """Start the forkserver (and its engine import) ahead of the first job."""
+    if _ctx.get_start_method() == "forkserver":
+        from multiprocessing import forkserver
+        forkserver.ensure_running()
+
+
+def _child(conn, file_path: str, out_path: str, params: dict):
+    if hasattr(os, "setpgrp"):
+        os.setpgrp()  # lead a group so a cancel also reaches our chunk workers
+    if sys.platform.startswith("linux"):
+        # Chunk workers fork from this single-threaded, already initialised
+        # process instead of starting (and importing into) their own forkserver
+        mp.set_start_method("fork", force=True)
+    import engine
+    from metrics import JobMetrics
+    m = JobMetrics(file_path, on_stage=lambda name: conn.send(("stage", name)))
+    try:
+        engine.process_file(file_path, out_path, params, progress=lambda p: conn.send(("progress", p)), metrics=m)
+        conn.send(("done", None, _metrics_state(m)))
+    except BaseException as e:
+        conn.send(("error", f"{type(e).__name__}: {e}", _metrics_state(m)))
+    finally:
+        conn.close()
+
+
+def _metrics_state(m) -> dict:
+    from metrics import process_usage
+    for worker in mp.active_children():
+        worker.join(KILL_GRACE_SECONDS)  # reap chunk workers so their CPU time is counted
+    return {"stages": m.stages, "audio_seconds": m.audio_seconds, "extra": m.extra, "usage": process_usage()}
+
+
+def _kill(proc):
+    """Kill the job and its chunk workers, escalating to SIGKILL if it lingers; waits for the exit."""
+    if proc.exitcode is None:
+        try:
+            if hasattr(os, "killpg"):
+                os.killpg(proc.pid, signal.SIGTERM)
+            else:
+                proc.terminate()
+        except (ProcessLookupError, PermissionError):
+            proc.terminate()  # cancelled before the child had set up its group
+    proc.join(KILL_GRACE_SECONDS)
+    if proc.exitcode is None:
+        if hasattr(os, "killpg"):
+            try:
+                os.killpg(proc.pid, signal.SIGKILL)
+            except (ProcessLookupError, PermissionError):
+                pass
+        proc.kill()
+        proc.join()
+    if hasattr(os, "killpg"):
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)  # chunk workers orphaned by a fast exit
+        except (ProcessLookupError, PermissionError):
+            pass
+
+
+@atexit.register
+def _kill_all():
+    with _live_lock:
+        procs = list(_live)
+    for proc in procs:
+        _kill(proc)
+
+
+def process_file(file_path: str, out_path: str = None, params: dict = None,
+                 progress=None, should_cancel=None, metrics=None) -> str:
+    """engine.process_file in a killable child process; same arguments, result and exceptions."""
+    params = params or default_params()
+    out_path = out_path or get_output_path(file_path)
+    recv, send = _ctx.Pipe(duplex=False)
+    proc = _ctx.Process(target=_child, args=(send, file_path, out_path, params), name="job")
+    with _live_lock:
+        proc.start()
+        _live.add(proc)
+    send.close()
+
+    result = None
+    try:
+        while result is None:
+            if should_cancel and should_cancel():
+                break
+            if not recv.poll(POLL_SECONDS):
+                if proc.exitcode is not None and not recv.poll():
+                    result = ("error", f"job process exited with code {proc.exitcode}", None)
+                continue
+            try:
+                msg = recv.recv()
+            except EOFError:
+                # Died without reporting (killed, crashed, failed to start); poll() stays true from now on
+                proc.join()
+                result = ("error", f"job process exited with code {proc.exitcode}", None)
+                break
+            if msg[0] == "progress":
+                if progress:
+                    progress(msg[1])
+            elif msg[0] == "stage":
+                if metrics is not None and metrics.on_stage:
+                    metrics.on_stage(msg[1])
+            else:
+                result = msg
+    finally:
+        if result is None:
+            _kill(proc)
+            remove_partials(out_path)
+        else:
+            proc.join()
+        with _live_lock:
+            _live.discard(proc)
+        recv.close()
+
+    if result is None:
+        raise JobCancelled(file_path)
+    kind, error, state = result
+    if metrics is not None and state:
+        metrics.stages.update(state["stages"])
+        metrics.audio_seconds = state["audio_seconds"]
+        metrics.extra.update(state["extra"])
+        metrics.child_usage = state["usage"]
+    if kind == "error":
+        if error.startswith("JobCancelled"):
+            raise JobCancelled(file_path)
+        raise RuntimeError(error)
+    return out_path
@@ -1,18 +1,27 @@
 import os
 import threading
 import subprocess
-import scipy.signal
 import customtkinter as ctk
 from tkinter import filedialog, messagebox
 from PIL import Image, ImageDraw, ImageFont
-import noisereduce as nr
-import soundfile as sf
-import librosa
-import numpy as np
+
+# Only light modules here: the DSP stack (numpy/scipy/librosa/noisereduce) loads in the
+# job processes, and in this process only once a preview needs it (see _warm_up)
+import job_process
+import settings
+from file_list import FileStore, RecentList, VirtualFileList
+from metrics import JobMetrics, RunReport
+from pipeline import JobCancelled
+from scheduler import JobScheduler, POLICIES
+from result_cache import ResultCache, process_cached
+from ui_events import TICK_MS, UiEventQueue
+from watcher import FolderWatcher, output_is_current
 
 # --- Configuration ---
 ctk.set_appearance_mode("dark")
 ctk.set_default_color_theme("blue")
+WATCH_POLL_MS = 500
+WATCH_BACKLOG_PER_JOB = 2  # watched files waiting per job slot before the watcher is throttled
 
 
 def open_in_explorer(path: str):
@@ -68,15 +77,29 @@ class NoiseReducerApp(ctk.CTk):
         self.minsize(width=1050, height=600)
 
         # State
-        self.file_queue = []
-        self.file_cards = {}
+        # Compact per-file state; only visible rows have widgets (see file_list)
+        self.files = FileStore()
         self.recent_folders = []
         self.recent_files = []
         self.cancel_flags = {}
         self.threads = {}
         self.saved_outputs = []
         self.stop_all_flag = False
+        self.stopping = False  # stop_all waiting for running jobs to exit
         self.updating_completed_ui = False
+        self.scheduler = JobScheduler(max_concurrent=os.cpu_count() or 1, policy="fifo")
+        self.params = settings.default_params()
+        self.run_report = RunReport()
+        # Worker threads never touch Tk; they post here and the main loop drains it
+        self.ui_events = UiEventQueue()
+        self.watcher = None
+        self.watch_poll = None  # after() id of the next _poll_watcher
+        self.preview_cache = None  # created with the first preview
+        try:
+            self.result_cache = ResultCache()
+        except OSError as e:
+            print(f"Result cache disabled: {e}")
+            self.result_cache = None
 
         # UI layout
         self.grid_columnconfigure(1, weight=1)
@@ -112,7 +135,7 @@ class NoiseReducerApp(ctk.CTk):
         # Top controls
         top_controls = ctk.CTkFrame(main, fg_color="transparent")
         top_controls.grid(row=0, column=0, sticky="ew", pady=(10, 6))
-        top_controls.grid_columnconfigure(2, weight=1)
+        top_controls.grid_columnconfigure(3, weight=1)
 
         self.add_btn = ctk.CTkButton(top_controls, text="Add Audio Files", command=self.add_files, height=36)
         self.add_btn.grid(row=0, column=0, padx=8)
@@ -122,6 +145,24 @@ class NoiseReducerApp(ctk.CTk):
                                                  fg_color="#A63232", hover_color="#8A2727")
         self.remove_selected_btn.grid(row=0, column=1, padx=8)
 
+        self.watch_btn = ctk.CTkButton(top_controls, text="Watch Folder…", command=self.toggle_watch, height=36,
+                                       width=120)
+        self.watch_btn.grid(row=0, column=2, padx=8)
+
+        self.cache_lbl = ctk.CTkLabel(top_controls, text="", anchor="e", font=ctk.CTkFont(size=11))
+        self.cache_lbl.grid(row=0, column=3, padx=8, sticky="e")
+
+        self.streaming_var = ctk.BooleanVar(value=self.params["streaming"])
+        self.streaming_chk = ctk.CTkCheckBox(top_controls, text="Low-memory streaming",
+                                             variable=self.streaming_var, command=self._on_streaming_toggled)
+        self.streaming_chk.grid(row=0, column=4, padx=8, sticky="e")
+
+        self.reduced_rate_var = ctk.BooleanVar(value=self.params["reduced_rate"])
+        self.reduced_rate_chk = ctk.CTkCheckBox(top_controls, text="Fast (reduced rate)",
+                                                variable=self.reduced_rate_var,
+                                                command=self._on_reduced_rate_toggled)
+        self.reduced_rate_chk.grid(row=0, column=5, padx=8, sticky="e")
+
         # Bottom controls (start/stop)
         bottom_controls = ctk.CTkFrame(main, fg_color="transparent")
         bottom_controls.grid(row=3, column=0, sticky="ew", pady=(6, 10))
@@ -131,14 +172,25 @@ class NoiseReducerApp(ctk.CTk):
                                        fg_color="#1f6aa5", hover_color="#155b8a")
         self.start_btn.grid(row=0, column=0, padx=8, sticky="w")
 
+        # Scheduler settings: how many files run at once and which queued file goes next
+        job_choices = [str(n) for n in range(1, max(2, (os.cpu_count() or 1) * 2) + 1)]
+        self.jobs_menu = ctk.CTkOptionMenu(bottom_controls, values=job_choices, width=70,
+                                           command=self._on_jobs_changed)
+        self.jobs_menu.set(str(self.scheduler.max_concurrent))
+        self.jobs_menu.grid(row=0, column=1, padx=8)
+
+        self.policy_menu = ctk.CTkOptionMenu(bottom_controls, values=list(POLICIES), width=100,
+                                             command=self._on_policy_changed)
+        self.policy_menu.set(self.scheduler.policy)
+        self.policy_menu.grid(row=0, column=2, padx=8)
+
+        self.report_btn = ctk.CTkButton(bottom_controls, text="Save Report", command=self.save_report,
+                                        height=44, width=110)
+        self.report_btn.grid(row=0, column=3, padx=8)
+
         self.stop_btn = ctk.CTkButton(bottom_controls, text="Stop All", command=self.stop_all, height=44,
                                       fg_color="#A63232", hover_color="#8A2727")
-        self.stop_btn.grid(row=0, column=1, padx=8, sticky="e")
-
-        # Scrollable area for file cards
-        self.cards_frame = ctk.CTkScrollableFrame(main, label_text="Files in Queue", height=520)
-        self.cards_frame.grid(row=2, column=0, sticky="nsew", padx=8, pady=8)
-        self.cards_frame.grid_columnconfigure(0, weight=1)
+        self.stop_btn.grid(row=0, column=4, padx=8, sticky="e")
 
         # Assets
         self.icon_size = (36, 36)
@@ -152,11 +204,20 @@ class NoiseReducerApp(ctk.CTk):
             self.icon_close = ctk.CTkImage(self.icon_close_img, size=(18, 18))
         except Exception:
             self.icon_folder = None
-            self.icon_audio = None
+            # One generated image shared by every row
+            self.icon_audio = ctk.CTkImage(_generate_fallback_icon(self.icon_size), size=self.icon_size)
             self.icon_close = None
 
         self.selected_card = None
 
+        # Virtualized list of file cards
+        self.file_list = VirtualFileList(main, self.files, self.icon_audio, self.icon_close,
+                                         on_remove=self._on_card_remove_clicked, on_select=self._select_card,
+                                         on_preview=self.open_preview, height=520)
+        self.file_list.grid(row=2, column=0, sticky="nsew", padx=8, pady=8)
+        self.recent_folders_list = RecentList(self.recent_scroll, open_in_explorer)
+        self.recent_files_list = RecentList(self.recent_files_scroll, open_in_explorer)
+
         # Instructions
         instr = ctk.CTkLabel(main, text="Add files, then press Start. Click ❌ on a card to remove/cancel that file.",
                              anchor="w", fg_color="transparent")
@@ -164,139 +225,129 @@ class NoiseReducerApp(ctk.CTk):
 
         self.update_recent_folders_ui()
         self.update_completed_files_ui()
+        self.after(TICK_MS, self._drain_ui_events)
+        # Now that the window is up, load the heavy parts in the background
+        threading.Thread(target=self._warm_up, daemon=True).start()
+
+    @staticmethod
+    def _warm_up():
+        # Job processes fork from a server that imports the engine once; start it before the first job
+        job_process.warm_up()
+        import preview_window  # noqa: F401  (pulls in the DSP stack the first preview needs)
+
+    def _drain_ui_events(self):
+        for handler, args in self.ui_events.drain():
+            try:
+                handler(*args)
+            except Exception as e:
+                print(f"UI update failed: {e}")
+        self.after(TICK_MS, self._drain_ui_events)
 
     # -----------------------------
     # UI helpers
     # -----------------------------
     def update_recent_folders_ui(self):
-        for w in self.recent_scroll.winfo_children():
-            w.destroy()
-
-        for folder in list(self.recent_folders):
-            row = ctk.CTkFrame(self.recent_scroll, fg_color="transparent")
-            row.pack(fill="x", pady=4, padx=6)
-
-            # Simple button
-            btn = ctk.CTkButton(row, text=os.path.basename(folder) or folder, fg_color="transparent",
-                                hover_color="#2C2C2C", anchor="w",
-                                command=lambda f=folder: open_in_explorer(f))
-            btn.pack(side="left", fill="x", expand=True)
+        for folder in reversed(self.recent_folders):
+            self.recent_folders_list.add(folder)
 
     def update_completed_files_ui(self):
-        # Safety check for widget existence
-        if not self.recent_files_scroll.winfo_exists():
-            return
-
-        # Clear existing widgets
-        for w in self.recent_files_scroll.winfo_children():
-            w.destroy()
-
-        # Create new widgets
-        for folder in list(self.recent_files):
-            try:
-                row = ctk.CTkFrame(self.recent_files_scroll, fg_color="transparent")
-                row.pack(fill="x", pady=4, padx=6)
-
-                btn = ctk.CTkButton(row, text=os.path.basename(folder) or folder, fg_color="transparent",
-                                    hover_color="#2C2C2C", anchor="w",
-                                    command=lambda f=folder: open_in_explorer(f))
-                btn.pack(side="left", fill="x", expand=True)
-            except Exception as e:
-                print(f"Error creating UI for completed file: {e}")
+        for path in reversed(self.recent_files):
+            self.recent_files_list.add(path)
 
     def add_completed_files(self, path):
         if path not in self.recent_files:
             self.recent_files.insert(0, path)
             self.recent_files = self.recent_files[:20]
-            # UI Update must happen on main thread
-            self.after(0, self.update_completed_files_ui)
+            self.recent_files_list.add(path)
 
     def add_files(self):
         files = filedialog.askopenfilenames(title="Select audio files",
                                             filetypes=[("Audio", "*.wav *.mp3 *.flac *.ogg *.m4a")])
         added = 0
         for f in files:
-            if f not in self.file_queue:
-                self.file_queue.append(f)
-                self._add_file_card(f)
+            if self.files.add(f):
                 folder = os.path.dirname(f)
                 if folder not in self.recent_folders:
                     self.recent_folders.insert(0, folder)
                     self.recent_folders = self.recent_folders[:20]
-                    self.update_recent_folders_ui()
+                    self.recent_folders_list.add(folder)
                 added += 1
 
-        if added == 0 and len(files) > 0:
-            # Only show if not adding anything new
-            pass
-
-    def _add_file_card(self, file_path: str):
-        card = ctk.CTkFrame(self.cards_frame, corner_radius=12, fg_color="#252525")
-        card.pack(fill="x", pady=8, padx=12)
-
-        # Left: Icon
-        left = ctk.CTkFrame(card, fg_color="transparent")
-        left.pack(side="left", padx=(10, 8), pady=10)
+        if added:
+            self.file_list.refresh()
+
+    def toggle_watch(self):
+        if self.watcher:
+            self.watcher.stop()
+            self.watcher = None
+            if self.watch_poll:
+                # Otherwise a quick restart would leave this loop running next to the new one
+                self.after_cancel(self.watch_poll)
+                self.watch_poll = None
+            self.watch_btn.configure(text="Watch Folder…")
+            return
 
-        if self.icon_audio:
-            icon_lbl = ctk.CTkLabel(left, image=self.icon_audio, text="")
-        else:
-            # Generate fallback if image failed
-            fb_img = ctk.CTkImage(_generate_fallback_icon((36, 36)), size=(36, 36))
-            icon_lbl = ctk.CTkLabel(left, image=fb_img, text="")
-        icon_lbl.pack()
-
-        # Center: Info
-        center = ctk.CTkFrame(card, fg_color="transparent")
-        center.pack(side="left", fill="both", expand=True, padx=(6, 8), pady=8)
-
-        name_lbl = ctk.CTkLabel(center, text=os.path.basename(file_path), anchor="w",
-                                font=ctk.CTkFont(size=14, weight="bold"))
-        name_lbl.pack(fill="x", anchor="w")
-
-        subt = ctk.CTkLabel(center, text=file_path, anchor="w", font=ctk.CTkFont(size=10))
-        subt.pack(fill="x", anchor="w", pady=(2, 6))
-
-        # Right: Remove
-        right = ctk.CTkFrame(card, fg_color="transparent")
-        right.pack(side="right", padx=(10, 10), pady=10)
-
-        rem = ctk.CTkButton(right, text="X", width=28, height=28,
-                            fg_color="#A63232", hover_color="#8A2727",
-                            command=lambda p=file_path: self._on_card_remove_clicked(p))
-        if self.icon_close:
-            rem.configure(image=self.icon_close, text="")
-        rem.pack()
-
-        self.file_cards[file_path] = {
-            "card": card,
-            "center": center,
-            "name_lbl": name_lbl,
-            "sub_lbl": subt,
-            "progress": None,
-            "remove_btn": rem,
-            "status": "pending",
-            "thread": None
-        }
-
-        def on_card_click(ev, p=file_path):
-            self._select_card(p)
-
-        card.bind("<Button-1>", on_card_click)
-        name_lbl.bind("<Button-1>", on_card_click)
-        subt.bind("<Button-1>", on_card_click)
+        folder = filedialog.askdirectory(title="Folder to watch for new recordings")
+        if not folder:
+            return
+        try:
+            self.watcher = FolderWatcher(
+                [folder], is_processed=lambda p: output_is_current(p, self._get_output_path(p))).start()
+        except OSError as e:
+            messagebox.showerror("Watch", f"Cannot watch {folder}: {e}")
+            return
+        print(f"Watching {folder} ({self.watcher.mode})")
+        self.watch_btn.configure(text="Stop Watching")
+        if folder not in self.recent_folders:
+            self.recent_folders.insert(0, folder)
+            self.recent_folders = self.recent_folders[:20]
+            self.recent_folders_list.add(folder)
+        self._poll_watcher()
+
+    def _poll_watcher(self):
+        """Move files the watcher found into the queue and start them, a few job slots' worth at a time."""
+        self.watch_poll = None
+        if not self.watcher:
+            return
+        if self.stopping:
+            # Leave new files with the watcher; the first poll after _cleanup_after_stop takes them
+            self.watch_poll = self.after(WATCH_POLL_MS, self._poll_watcher)
+            return
+        backlog = len(self.files.with_status("pending", "processing"))
+        room = WATCH_BACKLOG_PER_JOB * self.scheduler.max_concurrent - backlog
+        new = []
+        for path in self.watcher.take(max(0, room)):
+            data = self.files.get(path)
+            if data is None:
+                self.files.add(path)
+            elif data.status in ("done", "cancelled", "error"):
+                # Re-recorded under the same name: process it again
+                data.status, data.progress = "pending", None
+            else:
+                continue
+            self.files.get(path).detail = "queued"
+            new.append(path)
+        if new:
+            self.file_list.refresh()
+            self.start_btn.configure(state="disabled")
+            threading.Thread(target=self._enqueue_jobs, args=(new,), daemon=True).start()
+        self.watch_poll = self.after(WATCH_POLL_MS, self._poll_watcher)
 
     def _select_card(self, file_path: str):
-        if self.selected_card and self.selected_card in self.file_cards:
-            try:
-                prev_card = self.file_cards[self.selected_card]["card"]
-                prev_card.configure(fg_color="#252525")
-            except Exception:
-                pass  # Widget might be dead
-
         self.selected_card = file_path
-        if file_path in self.file_cards:
-            self.file_cards[file_path]["card"].configure(fg_color="#2C2C2C")
+        self.file_list.selected = file_path
+        self.file_list.refresh()
+
+    def open_preview(self, file_path: str):
+        from preview import PreviewCache
+        from preview_window import PreviewWindow
+        if self.preview_cache is None:
+            self.preview_cache = PreviewCache()
+        PreviewWindow(self, file_path, self.params, self.preview_cache, self.ui_events,
+                      open_file=open_in_explorer, on_apply=self._apply_preview_settings)
+
+    def _apply_preview_settings(self, stationary_args: dict):
+        self.params["stationary_args"] = dict(stationary_args)
 
     def remove_selected(self):
         if not self.selected_card:
@@ -306,213 +357,213 @@ class NoiseReducerApp(ctk.CTk):
         self.selected_card = None
 
     def _on_card_remove_clicked(self, file_path: str):
-        if file_path not in self.file_cards:
+        data = self.files.get(file_path)
+        if data is None:
             return
 
-        state = self.file_cards[file_path]["status"]
-        if state == "pending" or state == "done" or state == "cancelled":
+        if data.status == "pending" or data.status == "done" or data.status == "cancelled":
             self._remove_card(file_path)
-        elif state == "processing":
+        elif data.status == "processing":
             self._cancel_file(file_path)
 
-    def _remove_card(self, file_path: str):
-        if file_path in self.file_cards:
-            card = self.file_cards[file_path]["card"]
-
-            # 1. Hide immediately
-            card.pack_forget()
-
-            # 2. Schedule destruction safely on main thread
-            # This prevents the "Resize Storm" / TclError
-            self.after(100, lambda c=card: c.destroy())
-
-            del self.file_cards[file_path]
-
-        if file_path in self.file_queue:
-            self.file_queue.remove(file_path)
+    def _remove_card(self, file_path: str, refresh: bool = True):
+        self.files.remove(file_path)
+        if self.file_list.selected == file_path:
+            self.file_list.selected = None
+        if refresh:
+            self.file_list.refresh()
 
         self.cancel_flags.pop(file_path, None)
         self.threads.pop(file_path, None)
+        self.scheduler.cancel(file_path)
+
+    def _update_card(self, file_path: str, **changes):
+        """Change a file's state and redraw its row if it is on screen."""
+        data = self.files.get(file_path)
+        if data is None:
+            return
+        for key, value in changes.items():
+            setattr(data, key, value)
+        self.file_list.refresh_path(file_path)
 
     # -----------------------------
     # Processing
     # -----------------------------
     def start_all(self):
-        if not self.file_cards:
+        if not len(self.files):
             messagebox.showwarning("No files", "Add some audio files first.")
             return
 
         self.stop_all_flag = False
-        started_any = False
-
-        for path, data in list(self.file_cards.items()):
-            if data["status"] == "pending":
-                # Create progress bar
-                prog = ctk.CTkProgressBar(data["center"], width=320)
-                prog.set(0.0)
-                prog.pack(fill="x", pady=(2, 4))
-
-                self.cancel_flags[path] = False
-                data["progress"] = prog
-                data["status"] = "processing"
-
-                t = threading.Thread(target=self._process_single_file, args=(path,), daemon=True)
-                self.threads[path] = t
-                data["thread"] = t
-                t.start()
-                started_any = True
-
-        if started_any:
-            self.start_btn.configure(state="disabled")
-
-    def _process_single_file(self, file_path: str):
-
-        def update_prog(val):
-            if file_path in self.file_cards:
-                w = self.file_cards[file_path].get("progress")
-                if w and w.winfo_exists():
-                    w.set(val)
-
-        try:
-            # 1. Load Audio
-            y, sr = librosa.load(file_path, sr=None)
-        except Exception as e:
-            print(f"Load error: {e}")
-            self.after(0, lambda: self._handle_processing_error(file_path))
+        # Cancelled files run again too; long ones pick up from their saved chunks
+        paths = [d.path for d in self.files.with_status("pending", "cancelled")
+                 if not self.scheduler.is_pending(d.path)]
+        if not paths:
             return
 
-        # CAPTURE NOISE PROFILE
-        # We take a slightly longer sample (0.8s) for better accuracy
-        if len(y) > sr:
-            noise_part = y[0:int(0.8 * sr)]
-        else:
-            noise_part = y
-
-        stationary_args = {
-            "n_std_thresh_stationary": 1.3,
-            "prop_decrease": 1,
-            "n_fft": 8192,
-            "stationary": True
-        }
-
-        length = len(y)
-        # Larger chunks reduce "seams" in the audio
-        n_chunks = max(8, min(50, int(length / 300000) + 8))
-        chunk_size = length // n_chunks
-        reduced_parts = []
-        cancelled = False
-
-        for i in range(n_chunks):
-            if self.stop_all_flag or self.cancel_flags.get(file_path, False):
-                cancelled = True
-                break
-
-            start = i * chunk_size
-            end = length if i == n_chunks - 1 else (i + 1) * chunk_size
-            chunk = y[start:end]
+        self.start_btn.configure(state="disabled")
+        for p in paths:
+            data = self.files.get(p)
+            data.status, data.progress, data.detail = "pending", None, "queued"
+        self.file_list.refresh()
+
+        # Probing durations can be slow for compressed formats, keep it off the main loop
+        threading.Thread(target=self._enqueue_jobs, args=(paths,), daemon=True).start()
+
+    def _enqueue_jobs(self, paths: list):
+        for p in paths:
+            self.scheduler.submit(p)
+        self.ui_events.post_latest("pump", self._pump_scheduler)
+
+    def _pump_scheduler(self):
+        """Start every queued job the scheduler admits. Runs on the main loop."""
+        for path in self.scheduler.take_ready():
+            data = self.files.get(path)
+            if self.stop_all_flag or not data or data.status != "pending":
+                self.scheduler.finish(path)
+                continue
+            self._start_job(path)
+        self._maybe_enable_start()
+
+    def _start_job(self, path: str):
+        self.cancel_flags[path] = False
+        self._update_card(path, status="processing", progress=0.0, detail="")
+
+        t = threading.Thread(target=self._process_single_file, args=(path,), daemon=True)
+        self.threads[path] = t
+        t.start()
+
+    def _on_job_finished(self, file_path: str):
+        """Runs once the job's worker processes have exited."""
+        self.scheduler.finish(file_path)
+        if self.stopping and self.scheduler.running_count == 0:
+            self._cleanup_after_stop()
+            return
+        if self.result_cache:
+            self.ui_events.post_latest("cache_lbl", lambda: self.cache_lbl.configure(text=self.result_cache.summary()))
+        # Many jobs can finish in one tick; admit their successors in one pass
+        self.ui_events.post_latest("pump", self._pump_scheduler)
 
-            try:
-                # Apply reduction with profile
-                reduced_chunk = nr.reduce_noise(y=chunk, sr=sr, y_noise=noise_part, **stationary_args)
-                reduced_parts.append(reduced_chunk)
-            except Exception as e:
-                reduced_parts.append(chunk)
+    def _on_jobs_changed(self, value: str):
+        self.scheduler.max_concurrent = int(value)
+        self._pump_scheduler()
 
-            p = (i + 1) / n_chunks
-            self.after(0, lambda v=p: update_prog(v))
+    def _on_policy_changed(self, value: str):
+        self.scheduler.policy = value
 
-        if cancelled:
-            self.after(0, lambda: self._handle_cancellation(file_path))
-            return
+    def _on_streaming_toggled(self):
+        self.params["streaming"] = bool(self.streaming_var.get())
+        self.scheduler.configure(self.params)
 
-        try:
-            reduced_full = np.concatenate(reduced_parts) if reduced_parts else np.array([], dtype=np.float32)
+    def _on_reduced_rate_toggled(self):
+        self.params["reduced_rate"] = bool(self.reduced_rate_var.get())
 
-            nyquist = 0.5 * sr
-            cutoff = 10000 / nyquist
+    def _process_single_file(self, file_path: str):
 
-            if cutoff < 1.0:
-                b, a = scipy.signal.butter(8, cutoff, btype='low', analog=False)
-                reduced_full = scipy.signal.filtfilt(b, a, reduced_full)
+        def update_prog(val):
+            self._update_card(file_path, progress=val)
 
-            # Save
-            out_path = self._get_output_path(file_path)
-            sf.write(out_path, reduced_full, sr)
-            self.saved_outputs.append(out_path)
+        def show_stage(name):
+            self._update_card(file_path, detail=name)
 
-            self.after(0, lambda: self._handle_success(file_path, out_path))
+        def should_cancel():
+            return self.stop_all_flag or self.cancel_flags.get(file_path, False)
 
+        out_path = self._get_output_path(file_path)
+        metrics = JobMetrics(file_path,
+                             on_stage=lambda name: self.ui_events.post_latest(("stage", file_path), show_stage, name))
+        try:
+            params = dict(self.params)
+            # Cores not taken by other files go to this file's chunks
+            params["chunk_workers"] = max(1, (os.cpu_count() or 1) // self.scheduler.max_concurrent)
+            params["concurrent_jobs"] = self.scheduler.max_concurrent
+            with metrics.job():
+                # The job runs in a child process, so a cancel kills it mid-chunk instead of waiting for one
+                _, hit = process_cached(file_path, out_path, params, self.result_cache,
+                                        progress=lambda p: self.ui_events.post_latest(("progress", file_path),
+                                                                                      update_prog, p),
+                                        should_cancel=should_cancel, metrics=metrics,
+                                        process=job_process.process_file)
+            if hit:
+                print(f"Cache hit: {file_path}")
+            self.saved_outputs.append(out_path)
+            self.ui_events.post(self._handle_success, file_path, out_path, metrics.summary())
+        except JobCancelled:
+            self.ui_events.post(self._handle_cancellation, file_path)
         except Exception as e:
-            print(f"Write error: {e}")
-            self.after(0, lambda: self._handle_processing_error(file_path))
+            print(f"Processing error: {e}")
+            self.ui_events.post(self._handle_processing_error, file_path)
         finally:
-            self.after(0, self._maybe_enable_start)
+            self.run_report.add(metrics)
+            self.ui_events.post(self._on_job_finished, file_path)
 
     # --- Thread-Safe Completion Handlers ---
 
-    def _handle_success(self, file_path, out_path):
+    def _handle_success(self, file_path, out_path, summary: str):
         """Called by thread on main loop when done."""
-        print(f"Done: {file_path}")
+        print(f"Done: {file_path} ({summary})")
         self.add_completed_files(out_path)
-        # Remove card SAFELY using our soft delete method
-        self._remove_card(file_path)
+        # Keep the card so its timings stay visible; ❌ removes it
+        self._update_card(file_path, status="done", progress=None, detail=summary)
 
     def _handle_cancellation(self, file_path):
-        if file_path in self.file_cards:
-            self.file_cards[file_path]["status"] = "cancelled"
-            if self.file_cards[file_path]["progress"]:
-                self.file_cards[file_path]["progress"].set(0.0)
-
-        # cleanup partial file
-        out_path = self._get_output_path(file_path)
-        if os.path.exists(out_path):
-            try:
-                os.remove(out_path)
-            except:
-                pass
+        # No partial output to clean up: the engine only renames finished files into place.
+        # Long files keep their finished chunks, so starting them again resumes.
+        resumable = os.path.isdir(settings.work_dir_for(self._get_output_path(file_path)))
+        self._update_card(file_path, status="cancelled", progress=0.0,
+                          detail="cancelled — progress saved" if resumable else "cancelled")
 
     def _handle_processing_error(self, file_path):
-        if file_path in self.file_cards:
-            self.file_cards[file_path]["status"] = "error"
-            if self.file_cards[file_path]["progress"]:
-                self.file_cards[file_path]["progress"].set(0.0)
+        self._update_card(file_path, status="error", progress=0.0, detail="failed")
         messagebox.showerror("Error", f"Failed to process {os.path.basename(file_path)}")
 
+    def save_report(self):
+        if not self.run_report.rows:
+            messagebox.showinfo("Report", "No finished jobs yet.")
+            return
+        path = filedialog.asksaveasfilename(title="Save run report", defaultextension=".json",
+                                            filetypes=[("JSON", "*.json"), ("CSV", "*.csv")])
+        if path:
+            try:
+                self.run_report.write(path)
+            except OSError as e:
+                messagebox.showerror("Report", f"Could not write report: {e}")
+
     def _maybe_enable_start(self):
-        # Check if any threads are still running
-        still_running = False
-        for v in self.file_cards.values():
-            if v["status"] == "processing":
-                still_running = True
-                break
+        # Check if any threads are still running or waiting for a slot
+        still_running = not self.scheduler.is_idle() or bool(self.files.with_status("processing"))
         if not still_running:
             self.start_btn.configure(state="normal")
 
     def _get_output_path(self, file_path: str) -> str:
-        folder, name = os.path.split(file_path)
-        base, ext = os.path.splitext(name)
-        return os.path.join(folder, f"{base}_cleaned{ext}")
+        return settings.get_output_path(file_path)
 
     def _cancel_file(self, file_path: str):
         self.cancel_flags[file_path] = True
         # Thread will pick this up in the loop and call _handle_cancellation
 
     def stop_all(self):
-        processing = [v for v in self.file_cards.values() if v["status"] == "processing"]
+        processing = self.files.with_status("processing")
         if not processing:
             if messagebox.askyesno("Clear", "Clear queue?"):
-                for p in list(self.file_cards.keys()):
-                    self._remove_card(p)
+                for data in self.files:
+                    self._remove_card(data.path, refresh=False)
+                self.file_list.refresh()
             return
 
         if not messagebox.askyesno("Stop", "Stop all processing?"):
             return
 
         self.stop_all_flag = True
+        self.stopping = True
+        self.stop_btn.configure(state="disabled")
         for k in self.cancel_flags:
             self.cancel_flags[k] = True
-
-        self.after(1000, self._cleanup_after_stop)
+        for p in self.scheduler.clear_pending():
+            self._update_card(p, detail="")
+        # _on_job_finished runs the cleanup once the last running job has actually exited
+        if self.scheduler.running_count == 0:
+            self._cleanup_after_stop()
 
     def _cleanup_after_stop(self):
         # Clean up files created during this session
@@ -525,13 +576,13 @@ class NoiseReducerApp(ctk.CTk):
         self.saved_outputs.clear()
 
         # Reset UI
-        for p, data in list(self.file_cards.items()):
-            if data["status"] == "processing":
-                data["status"] = "cancelled"
-                if data["progress"]: data["progress"].set(0.0)
+        for data in self.files.with_status("processing"):
+            self._update_card(data.path, status="cancelled", progress=0.0)
 
         self.start_btn.configure(state="normal")
+        self.stop_btn.configure(state="normal")
         self.stop_all_flag = False
+        self.stopping = False
         messagebox.showinfo("Stopped", "Processing stopped.")
 
 
@@ -0,0 +1,277 @@
+"""Per-job instrumentation: stage timings, CPU time, peak RSS and real-time factor."""
+import csv
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+PROFILERS = ("cprofile", "pyinstrument")
+
+
+def peak_rss_bytes():
+    """Peak resident set size of this process, or None if it can't be measured here.
+
+    On Linux this is the peak since the last reset_peak_rss(); elsewhere it
+    is the lifetime peak.
+    """
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports KiB, macOS bytes
+        return peak if sys.platform == "darwin" else peak * 1024
+    try:
+        import psutil
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss)
+    except Exception:
+        return None
+
+
+def reset_peak_rss() -> bool:
+    """Restart this process's peak-RSS high-water mark (Linux only). Returns False where unsupported.
+
+    ru_maxrss can't be reset and also keeps the peaks of exited threads, so
+    peak_rss_bytes reads VmHWM, which this resets.
+    """
+    try:
+        with open("/proc/self/clear_refs", "w", encoding="ascii") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def process_usage() -> dict:
+    """CPU seconds of this whole process and its reaped children, and its peak RSS."""
+    return {"cpu": time.process_time() + _children_cpu(), "peak_rss": peak_rss_bytes()}
+
+
+def _children_cpu() -> float:
+    """CPU seconds of reaped child processes (chunk workers), 0 where unsupported."""
+    if resource is None:
+        return 0.0
+    ru = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return ru.ru_utime + ru.ru_stime
+
+
+class JobMetrics:
+    """Collects timings for one job. Stages may be entered from several threads.
+
+    Wall time is summed per stage; in the streaming path stages interleave,
+    so their sum can exceed the job's wall time. CPU time is the entering
+    thread's CPU plus any child processes reaped meanwhile; when the work ran
+    in a job process (see job_process.py), that process's own CPU time and
+    peak RSS are reported in `child_usage` and used instead. Peak RSS is
+    measured from the start of the job, so a pool worker that is reused for
+    several files reports each one's own peak.
+    """
+
+    def __init__(self, file_path: str, on_stage=None, profiler: str = None, profile_dir: str = None):
+        if profiler and profiler not in PROFILERS:
+            raise ValueError(f"Unknown profiler: {profiler}")
+        self.file_path = file_path
+        self.on_stage = on_stage
+        self.profiler = profiler
+        self.profile_dir = profile_dir
+        self.profile_path = None
+        self.stages = {}
+        self.audio_seconds = None
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.peak_rss = None
+        self.child_usage = None
+        self.status = "pending"
+        self.cache_hit = False
+        self.extra = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str):
+        if self.on_stage:
+            self.on_stage(name)
+        w0, c0, k0 = time.perf_counter(), time.thread_time(), _children_cpu()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - w0
+            cpu = time.thread_time() - c0 + _children_cpu() - k0
+            with self._lock:
+                s = self.stages.setdefault(name, {"wall": 0.0, "cpu": 0.0})
+                s["wall"] += wall
+                s["cpu"] += cpu
+
+    @contextmanager
+    def job(self):
+        """Wrap a whole job: total wall/CPU, peak RSS, status and the optional profiler."""
+        w0, c0, k0 = time.perf_counter(), time.process_time(), _children_cpu()
+        reset_peak_rss()
+        self.status = "processing"
+        try:
+            with self._profiling():
+                yield self
+            self.status = "done"
+        except BaseException as e:
+            self.status = "cancelled" if type(e).__name__ == "JobCancelled" else "error"
+            raise
+        finally:
+            self.wall = time.perf_counter() - w0
+            if self.child_usage:
+                self.cpu, self.peak_rss = self.child_usage["cpu"], self.child_usage["peak_rss"]
+            else:
+                self.cpu = time.process_time() - c0 + _children_cpu() - k0
+                self.peak_rss = peak_rss_bytes()
+
+    @contextmanager
+    def _profiling(self):
+        if not self.profiler:
+            yield
+            return
+        folder = self.profile_dir or "."
+        os.makedirs(folder, exist_ok=True)
+        base = os.path.splitext(os.path.basename(self.file_path))[0]
+        if self.profiler == "pyinstrument":
+            from pyinstrument import Profiler
+            prof = Profiler()
+            prof.start()
+            try:
+                yield
+            finally:
+                prof.stop()
+                self.profile_path = os.path.join(folder, f"{base}.pyinstrument.html")
+                with open(self.profile_path, "w", encoding="utf-8") as f:
+                    f.write(prof.output_html())
+        else:
+            import cProfile
+            prof = cProfile.Profile()
+            prof.enable()
+            try:
+                yield
+            finally:
+                prof.disable()
+                self.profile_path = os.path.join(folder, f"{base}.prof")
+                prof.dump_stats(self.profile_path)
+
+    @property
+    def rtf(self):
+        """Real-time factor: processing seconds per second of audio (below 1 = faster than real time)."""
+        if not self.audio_seconds:
+            return None
+        return self.wall / self.audio_seconds
+
+    def summary(self) -> str:
+        """One line for a file card or log."""
+        if self.cache_hit:
+            return f"cached in {self.wall:.1f}s"
+        parts = [f"{name} {s['wall']:.1f}s" for name, s in self.stages.items()]
+        text = f"{self.wall:.1f}s"
+        if self.rtf is not None:
+            text += f" (RTF {self.rtf:.3f})"
+        if parts:
+            text += " — " + ", ".join(parts)
+        if self.extra.get("noise_start_s"):
+            text += f" (noise from {self.extra['noise_start_s']:.1f}s)"
+        if self.extra.get("resumed_chunks"):
+            text += f" (resumed {self.extra['resumed_chunks']} saved chunks)"
+        return text
+
+    def to_dict(self) -> dict:
+        row = {
+            "file": self.file_path,
+            "status": self.status,
+            "cache_hit": self.cache_hit,
+            "audio_seconds": self.audio_seconds,
+            "wall_s": round(self.wall, 4),
+            "cpu_s": round(self.cpu, 4),
+            "rtf": round(self.rtf, 5) if self.rtf is not None else None,
+            "peak_rss_mb": round(self.peak_rss / 1024 ** 2, 1) if self.peak_rss else None,
+            "profile": self.profile_path,
+        }
+        for name, s in self.stages.items():
+            row[f"{name}_wall_s"] = round(s["wall"], 4)
+            row[f"{name}_cpu_s"] = round(s["cpu"], 4)
+        row.update(self.extra)
+        return row
+
+
+class SharedPeak:
+    """Peak RSS of jobs that overlap in one process (see engine.process_batch).
+
+    Whenever a job starts or ends, the high-water mark since the previous
+    start or end is credited to every job that was running in between, then
+    reset. A job's peak therefore covers its own lifetime, including whatever
+    the jobs overlapping it held at the time.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._running = []
+
+    def _settle(self):
+        peak = peak_rss_bytes()
+        if peak is not None:
+            for m in self._running:
+                m.peak_rss = max(m.peak_rss or 0, peak)
+        reset_peak_rss()
+
+    def start(self, metrics: "JobMetrics"):
+        with self._lock:
+            self._settle()
+            self._running.append(metrics)
+
+    def end(self, metrics: "JobMetrics"):
+        with self._lock:
+            self._settle()
+            if metrics in self._running:
+                self._running.remove(metrics)
+
+
+def stage(metrics, name: str):
+    """metrics.stage(name), or a no-op when no metrics are being collected."""
+    return metrics.stage(name) if metrics is not None else nullcontext()
+
+
+class RunReport:
+    """Rows of JobMetrics.to_dict() for a whole run, exportable as JSON or CSV."""
+
+    def __init__(self):
+        self.rows = []
+        self._lock = threading.Lock()
+
+    def add(self, row):
+        if isinstance(row, JobMetrics):
+            row = row.to_dict()
+        with self._lock:
+            self.rows.append(row)
+
+    def write(self, path: str):
+        """Format follows the extension: .csv, anything else is JSON."""
+        if path.lower().endswith(".csv"):
+            self.write_csv(path)
+        else:
+            self.write_json(path)
+
+    def write_json(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "jobs": self.rows}, f, indent=2)
+
+    def write_csv(self, path: str):
+        fields = []
+        for row in self.rows:
+            fields.extend(k for k in row if k not in fields)
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            writer.writerows(self.rows)
@@ -0,0 +1,146 @@
+"""Precomputed noise statistics for stationary spectral gating.
+
+`nr.reduce_noise(y_noise=...)` recomputes the STFT and per-frequency
+statistics of the noise clip on every call. A NoiseProfile holds those
+statistics so they are computed once per file (or once per room/mic via the
+on-disk cache) and reused for every chunk.
+"""
+import inspect
+import os
+
+import numpy as np
+import noisereduce as nr
+from noisereduce.spectralgate.base import SpectralGate
+from noisereduce.spectralgate.stationary import SpectralGateStationary
+from noisereduce.spectralgate.utils import _amp_to_db
+from scipy.signal import stft
+
+from hashing import fast_file_hash
+from settings import PROFILE_DIR
+
+_REDUCE_DEFAULTS = {k: p.default for k, p in inspect.signature(nr.reduce_noise).parameters.items()
+                    if p.default is not inspect.Parameter.empty}
+
+
+def _gate_args(stationary_args: dict) -> dict:
+    args = dict(_REDUCE_DEFAULTS)
+    args.update(stationary_args)
+    win = args["win_length"] or args["n_fft"]
+    args["win_length"] = win
+    args["hop_length"] = args["hop_length"] or win // 4
+    return args
+
+
+def hop_length(stationary_args: dict) -> int:
+    """STFT hop noisereduce uses for these arguments (a quarter window unless set)."""
+    return _gate_args(stationary_args)["hop_length"]
+
+
+class NoiseProfile:
+    """Per-frequency mean/std (dB) of a noise clip for one sr/n_fft/window setup."""
+
+    def __init__(self, mean_db: np.ndarray, std_db: np.ndarray, sr: int, n_fft: int,
+                 win_length: int, hop_length: int):
+        self.mean_db = np.asarray(mean_db)
+        self.std_db = np.asarray(std_db)
+        self.sr = int(sr)
+        self.n_fft = int(n_fft)
+        self.win_length = int(win_length)
+        self.hop_length = int(hop_length)
+
+    @classmethod
+    def from_signal(cls, y_noise: np.ndarray, sr: int, stationary_args: dict) -> "NoiseProfile":
+        """Same statistics SpectralGateStationary computes in its constructor."""
+        args = _gate_args(stationary_args)
+        y_noise = np.asarray(y_noise)
+        if y_noise.ndim > 1:
+            y_noise = np.mean(y_noise, axis=0)
+        _, _, noise_stft = stft(y_noise, nfft=args["n_fft"], noverlap=args["win_length"] - args["hop_length"],
+                                nperseg=args["win_length"], padded=False)
+        noise_db = _amp_to_db(noise_stft)
+        return cls(np.mean(noise_db, axis=1), np.std(noise_db, axis=1), sr,
+                   args["n_fft"], args["win_length"], args["hop_length"])
+
+    def threshold(self, n_std_thresh: float) -> np.ndarray:
+        return self.mean_db + self.std_db * n_std_thresh
+
+    def matches(self, sr: int, stationary_args: dict) -> bool:
+        args = _gate_args(stationary_args)
+        return (self.sr, self.n_fft, self.win_length, self.hop_length) == \
+            (int(sr), args["n_fft"], args["win_length"], args["hop_length"])
+
+    def save(self, path: str):
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        tmp = f"{path}.tmp.npz"
+        np.savez(tmp, mean_db=self.mean_db, std_db=self.std_db,
+                 meta=np.array([self.sr, self.n_fft, self.win_length, self.hop_length]))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "NoiseProfile":
+        with np.load(path) as data:
+            sr, n_fft, win, hop = (int(v) for v in data["meta"])
+            return cls(data["mean_db"], data["std_db"], sr, n_fft, win, hop)
+
+
+class _ProfiledGate(SpectralGateStationary):
+    """SpectralGateStationary that takes its noise statistics from a NoiseProfile."""
+
+    def __init__(self, y, sr, profile: NoiseProfile, args: dict):
+        SpectralGate.__init__(
+            self, y=y, sr=sr, prop_decrease=args["prop_decrease"], chunk_size=args["chunk_size"],
+            padding=args["padding"], n_fft=args["n_fft"], win_length=args["win_length"],
+            hop_length=args["hop_length"], time_constant_s=args["time_constant_s"],
+            freq_mask_smooth_hz=args["freq_mask_smooth_hz"], time_mask_smooth_ms=args["time_mask_smooth_ms"],
+            tmp_folder=args["tmp_folder"], use_tqdm=args["use_tqdm"], n_jobs=args["n_jobs"],
+        )
+        self.n_std_thresh_stationary = args["n_std_thresh_stationary"]
+        self.mean_freq_noise = profile.mean_db
+        self.std_freq_noise = profile.std_db
+        self.noise_thresh = profile.threshold(self.n_std_thresh_stationary)
+
+
+def reduce_with_profile(y: np.ndarray, sr: int, profile: NoiseProfile, stationary_args: dict) -> np.ndarray:
+    """Drop-in for nr.reduce_noise(y, sr, y_noise=..., stationary=True, ...) with precomputed stats."""
+    if not profile.matches(sr, stationary_args):
+        raise ValueError(f"Noise profile is for sr={profile.sr}, n_fft={profile.n_fft}; "
+                         f"got sr={sr}, n_fft={stationary_args.get('n_fft')}")
+    return _ProfiledGate(y, sr, profile, _gate_args(stationary_args)).get_traces()
+
+
+def profile_key(file_path: str, offset: int, length: int, sr: int, stationary_args: dict,
+                channel: int = None) -> str:
+    args = _gate_args(stationary_args)
+    key = (f"{fast_file_hash(file_path)}_{offset}_{length}_{sr}_"
+           f"{args['n_fft']}_{args['win_length']}_{args['hop_length']}")
+    return key if channel is None else f"{key}_ch{channel}"
+
+
+def get_profile(file_path: str, y_noise: np.ndarray, sr: int, stationary_args: dict,
+                offset: int = 0, cache_dir: str = PROFILE_DIR, channel: int = None) -> NoiseProfile:
+    """Profile of `y_noise` (taken from `file_path` at `offset`), cached on disk when cache_dir is set.
+
+    `channel` picks one channel of a multichannel file; None means a mono file.
+    """
+    if not cache_dir:
+        return NoiseProfile.from_signal(y_noise, sr, stationary_args)
+
+    try:
+        path = os.path.join(cache_dir, profile_key(file_path, offset, len(y_noise), sr, stationary_args,
+                                                    channel) + ".npz")
+    except OSError:
+        return NoiseProfile.from_signal(y_noise, sr, stationary_args)
+    if os.path.exists(path):
+        try:
+            return NoiseProfile.load(path)
+        except Exception as e:
+            print(f"Ignoring unreadable noise profile {path}: {e}")
+
+    profile = NoiseProfile.from_signal(y_noise, sr, stationary_args)
+    try:
+        profile.save(path)
+    except OSError as e:
+        print(f"Could not cache noise profile: {e}")
+    return profile
@@ -0,0 +1,107 @@
+"""Automatic choice of the stretch of a file its noise profile is estimated from.
+
+Profiles used to come from the first noise_seconds of every file, which is
+wrong whenever a recording opens with speech. Here the whole signal is cut
+into short frames (about 20 ms) and each frame gets its level (RMS in dB) and
+spectral flatness (geometric over arithmetic mean of the power spectrum: near
+0.5 for broadband noise, far lower for voiced speech or music). Every
+noise_seconds-long run of frames is then scored in one vectorised pass, and
+the quietest, steadiest run among the noise-like ones wins.
+
+Frames are computed in batches as blocks arrive, so long files can be
+scanned while streaming them and memory stays bounded.
+"""
+from functools import reduce
+
+import numpy as np
+import scipy.fft
+
+FRAME_SECONDS = 0.02
+BATCH_FRAMES = 2048
+SILENCE_DB = -90.0  # digital silence (muted lead-ins, fades) says nothing about the noise floor
+
+
+def frame_size(sr: int) -> int:
+    """Power-of-two frame length closest to FRAME_SECONDS at rate sr."""
+    return 1 << max(6, int(round(np.log2(FRAME_SECONDS * sr))))
+
+
+def downmix(rows: np.ndarray) -> np.ndarray:
+    """Average of a channels × samples array's rows, added in channel order so every caller gets the same bits."""
+    if rows.ndim == 1 or len(rows) == 1:
+        return np.asarray(rows).reshape(-1)
+    return reduce(np.add, rows) / np.float32(len(rows))
+
+
+def frame_features(frames: np.ndarray):
+    """Level in dB and spectral flatness of every row of a frames × frame_size array."""
+    level_db = 10.0 * np.log10(np.mean(np.square(frames, dtype=np.float32), axis=1) + 1e-20)
+    power = np.square(np.abs(scipy.fft.rfft(frames * np.hanning(frames.shape[1]).astype(np.float32), axis=1)))
+    power += 1e-12
+    flatness = np.exp(np.mean(np.log(power), axis=1)) / np.mean(power, axis=1)
+    return level_db, flatness
+
+
+def pick_window(level_db: np.ndarray, flatness: np.ndarray, width: int) -> int:
+    """Index of the first frame of the best `width`-frame window.
+
+    Windows that touch digital silence are skipped, and so is the less
+    noise-like half (by mean flatness); of the rest, the one with the lowest
+    mean level plus level spread wins.
+    """
+    width = max(1, min(width, len(level_db)))
+
+    def moving(x):
+        c = np.concatenate(([0.0], np.cumsum(x, dtype=np.float64)))
+        return (c[width:] - c[:-width]) / width
+
+    mean = moving(level_db)
+    spread = np.sqrt(np.maximum(moving(np.square(level_db, dtype=np.float64)) - mean ** 2, 0.0))
+    flat = moving(flatness)
+    ok = moving(level_db < SILENCE_DB) == 0
+    if not ok.any():
+        ok[:] = True
+    ok &= flat >= np.median(flat[ok])
+    return int(np.argmin(np.where(ok, mean + spread, np.inf)))
+
+
+class Scanner:
+    """Frame features of a mono signal fed in consecutive blocks of any size."""
+
+    def __init__(self, sr: int):
+        self.sr = sr
+        self.frame = frame_size(sr)
+        self.samples = 0
+        self._tail = np.zeros(0, dtype=np.float32)
+        self._levels = []
+        self._flatness = []
+
+    def feed(self, block: np.ndarray):
+        x = np.asarray(block, dtype=np.float32)
+        if len(self._tail):
+            x = np.concatenate((self._tail, x))
+        self.samples += len(block)
+        n = len(x) // self.frame
+        step = BATCH_FRAMES * self.frame
+        for s in range(0, n * self.frame, step):
+            level_db, flatness = frame_features(x[s:min(s + step, n * self.frame)].reshape(-1, self.frame))
+            self._levels.append(level_db)
+            self._flatness.append(flatness)
+        self._tail = x[n * self.frame:]
+
+    def window(self, seconds: float):
+        """(start, end) samples of the chosen noise_seconds-long window."""
+        length = int(seconds * self.sr)
+        if self.samples <= length or not self._levels:
+            return 0, self.samples
+        width = -(-length // self.frame)
+        start = pick_window(np.concatenate(self._levels), np.concatenate(self._flatness), width) * self.frame
+        start = min(start, self.samples - length)
+        return start, start + length
+
+
+def find(y: np.ndarray, sr: int, seconds: float):
+    """(start, end) samples of the best noise window of a whole mono signal."""
+    scanner = Scanner(sr)
+    scanner.feed(y)
+    return scanner.window(seconds)
@@ -0,0 +1,161 @@
+"""Plumbing for staged processing: background producers, async writers and atomic outputs."""
+import glob
+import os
+import queue
+import stat
+import tempfile
+import threading
+from contextlib import contextmanager
+
+_DONE = object()
+# Read once: os.umask can only be queried by setting it, which isn't thread-safe later on
+_UMASK = os.umask(0o022)
+os.umask(_UMASK)
+
+
+class JobCancelled(Exception):
+    """Raised when a job is cancelled between chunks."""
+
+
+class _Failure:
+    def __init__(self, exc: BaseException):
+        self.exc = exc
+
+
+def _put(q: queue.Queue, item, stop: threading.Event) -> bool:
+    """Blocking put that gives up once `stop` is set. Returns False if it gave up."""
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def prefetch(iterable, maxsize: int = 2):
+    """Iterate `iterable` on a background thread, keeping up to `maxsize` items ready.
+
+    Exceptions raised by the producer are re-raised in the consumer. Closing
+    the generator early (break, cancellation) stops the producer at its next
+    item.
+    """
+    q = queue.Queue(maxsize=max(1, maxsize))
+    stop = threading.Event()
+
+    def produce():
+        try:
+            for item in iterable:
+                if not _put(q, item, stop):
+                    return
+            _put(q, _DONE, stop)
+        except BaseException as e:
+            _put(q, _Failure(e), stop)
+
+    threading.Thread(target=produce, daemon=True, name="prefetch").start()
+    try:
+        while True:
+            item = q.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _Failure):
+                raise item.exc
+            yield item
+    finally:
+        stop.set()
+
+
+class AsyncWriter:
+    """Runs `sink(item)` for every written item on a background thread.
+
+    `write` blocks once `maxsize` items are queued (backpressure). A sink
+    error is raised from the next `write` or from `close`.
+    """
+
+    def __init__(self, sink, maxsize: int = 4):
+        self._sink = sink
+        self._q = queue.Queue(maxsize=max(1, maxsize))
+        self._stop = threading.Event()
+        self._error = None
+        self._thread = threading.Thread(target=self._run, daemon=True, name="writer")
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            item = self._q.get()
+            if item is _DONE:
+                return
+            if self._error is None and not self._stop.is_set():
+                try:
+                    self._sink(item)
+                except BaseException as e:
+                    self._error = e
+
+    def write(self, item):
+        if self._error is not None:
+            raise self._error
+        _put(self._q, item, self._stop)
+
+    def close(self):
+        """Drain the queue and wait for the writer; re-raises a sink error."""
+        self._q.put(_DONE)
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+
+    def abort(self):
+        """Drop anything still queued and stop the writer."""
+        self._stop.set()
+        self._q.put(_DONE)
+        self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+
+@contextmanager
+def atomic_output(out_path: str):
+    """Yield a temp path next to `out_path` that is renamed over it only on success.
+
+    The temp name keeps the extension so soundfile can infer the format. A
+    crash or cancel leaves at most a hidden '.partial' file, never a
+    truncated `*_cleaned` output. The result gets the mode the file it
+    replaces had, or what a plain open() would have given it (mkstemp's
+    temp files are owner-only).
+    """
+    folder, name = os.path.split(os.path.abspath(out_path))
+    base, ext = os.path.splitext(name)
+    fd, tmp = tempfile.mkstemp(dir=folder, prefix=f".{base}.", suffix=f".partial{ext}")
+    os.close(fd)
+    try:
+        yield tmp
+        try:
+            mode = stat.S_IMODE(os.stat(out_path).st_mode)
+        except FileNotFoundError:
+            mode = 0o666 & ~_UMASK
+        os.chmod(tmp, mode)
+        os.replace(tmp, out_path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def remove_partials(out_path: str):
+    """Delete temp files atomic_output left for out_path when its writer was killed outright."""
+    folder, name = os.path.split(os.path.abspath(out_path))
+    base, ext = os.path.splitext(name)
+    for tmp in glob.glob(os.path.join(glob.escape(folder), f".{glob.escape(base)}.*.partial{glob.escape(ext)}")):
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
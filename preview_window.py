@@ -0,0 +1,146 @@
+"""Preview dialog: audition gate settings on a short excerpt of one queued file.
+
+Rendering runs on a worker thread (see preview.render) and reports back
+through the app's UiEventQueue; listening writes the excerpt to a temp WAV
+and opens it in the system player.
+"""
+import os
+import tempfile
+import threading
+
+import customtkinter as ctk
+import soundfile as sf
+
+import preview
+
+
+class PreviewWindow(ctk.CTkToplevel):
+    def __init__(self, master, file_path: str, params: dict, cache: preview.PreviewCache, ui_events,
+                 open_file, on_apply):
+        super().__init__(master)
+        self.file_path = file_path
+        self.params = dict(params, stationary_args=dict(params["stationary_args"]))
+        self.cache = cache
+        self.ui_events = ui_events
+        self.open_file = open_file
+        self.on_apply = on_apply
+        self.result = None
+        self._busy = False
+        self._again = False
+
+        self.title(f"Preview — {os.path.basename(file_path)}")
+        self.geometry("460x300")
+        self.resizable(False, False)
+        self.grid_columnconfigure(1, weight=1)
+
+        ctk.CTkLabel(self, text="Start (s)").grid(row=0, column=0, padx=12, pady=(14, 4), sticky="w")
+        self.start_entry = ctk.CTkEntry(self, width=80)
+        self.start_entry.insert(0, "0")
+        self.start_entry.grid(row=0, column=1, padx=12, pady=(14, 4), sticky="w")
+
+        ctk.CTkLabel(self, text="Length (s)").grid(row=1, column=0, padx=12, pady=4, sticky="w")
+        self.length_entry = ctk.CTkEntry(self, width=80)
+        self.length_entry.insert(0, f"{preview.PREVIEW_SECONDS:g}")
+        self.length_entry.grid(row=1, column=1, padx=12, pady=4, sticky="w")
+        for entry in (self.start_entry, self.length_entry):
+            entry.bind("<Return>", lambda ev: self.render())
+
+        args = self.params["stationary_args"]
+        self.thresh_lbl = ctk.CTkLabel(self, text="")
+        self.thresh_lbl.grid(row=2, column=0, padx=12, pady=4, sticky="w")
+        self.thresh_slider = ctk.CTkSlider(self, from_=0.5, to=3.0, number_of_steps=25,
+                                           command=lambda v: self._on_slider())
+        self.thresh_slider.set(args["n_std_thresh_stationary"])
+        self.thresh_slider.grid(row=2, column=1, padx=12, pady=4, sticky="ew")
+
+        self.prop_lbl = ctk.CTkLabel(self, text="")
+        self.prop_lbl.grid(row=3, column=0, padx=12, pady=4, sticky="w")
+        self.prop_slider = ctk.CTkSlider(self, from_=0.0, to=1.0, number_of_steps=20,
+                                         command=lambda v: self._on_slider())
+        self.prop_slider.set(args["prop_decrease"])
+        self.prop_slider.grid(row=3, column=1, padx=12, pady=4, sticky="ew")
+        self._show_settings()
+
+        buttons = ctk.CTkFrame(self, fg_color="transparent")
+        buttons.grid(row=4, column=0, columnspan=2, pady=(12, 4))
+        self.play_before_btn = ctk.CTkButton(buttons, text="Play original", width=120, state="disabled",
+                                             command=lambda: self._play("before"))
+        self.play_before_btn.grid(row=0, column=0, padx=6)
+        self.play_after_btn = ctk.CTkButton(buttons, text="Play cleaned", width=120, state="disabled",
+                                            command=lambda: self._play("after"))
+        self.play_after_btn.grid(row=0, column=1, padx=6)
+        ctk.CTkButton(buttons, text="Apply to queue", width=120, command=self._apply).grid(row=0, column=2, padx=6)
+
+        self.status_lbl = ctk.CTkLabel(self, text="", font=ctk.CTkFont(size=11))
+        self.status_lbl.grid(row=5, column=0, columnspan=2, padx=12, pady=(4, 12))
+
+        self.render()
+
+    def _show_settings(self):
+        self.thresh_lbl.configure(text=f"Threshold ({self.thresh_slider.get():.1f} σ)")
+        self.prop_lbl.configure(text=f"Reduction ({self.prop_slider.get():.0%})")
+
+    def _on_slider(self):
+        self._show_settings()
+        self.render()
+
+    def _current_params(self) -> dict:
+        args = dict(self.params["stationary_args"],
+                    n_std_thresh_stationary=round(self.thresh_slider.get(), 2),
+                    prop_decrease=round(self.prop_slider.get(), 2))
+        return dict(self.params, stationary_args=args)
+
+    def render(self):
+        """Render the current window and settings; while one render runs, only the latest request is kept."""
+        if self._busy:
+            self._again = True
+            return
+        try:
+            start = max(0.0, float(self.start_entry.get()))
+            length = min(60.0, max(0.5, float(self.length_entry.get())))
+        except ValueError:
+            self.status_lbl.configure(text="Start and length must be numbers")
+            return
+        self._busy = True
+        self.status_lbl.configure(text="Rendering…")
+        params = self._current_params()
+        threading.Thread(target=self._render_worker, args=(start, length, params), daemon=True).start()
+
+    def _render_worker(self, start: float, length: float, params: dict):
+        try:
+            result = preview.render(self.file_path, start, length, params, self.cache)
+            self.ui_events.post(self._on_rendered, result, None)
+        except Exception as e:
+            self.ui_events.post(self._on_rendered, None, e)
+
+    def _on_rendered(self, result, error):
+        self._busy = False
+        if not self.winfo_exists():
+            return
+        if self._again:
+            self._again = False
+            self.render()
+            return
+        if error is not None:
+            self.status_lbl.configure(text=f"Preview failed: {error}")
+            return
+        self.result = result
+        took = "cached" if result["cached"] else f"rendered in {result['seconds']:.2f} s"
+        self.status_lbl.configure(text=f"{result['after'].shape[-1] / result['sr']:.1f} s from {result['start']:g} s, {took}")
+        self.play_before_btn.configure(state="normal")
+        self.play_after_btn.configure(state="normal")
+
+    def _play(self, which: str):
+        if not self.result:
+            return
+        path = os.path.join(tempfile.gettempdir(), f"noise_reducer_preview_{which}.wav")
+        try:
+            sf.write(path, self.result[which].T, self.result["sr"])
+        except OSError as e:
+            self.status_lbl.configure(text=f"Cannot write preview: {e}")
+            return
+        self.open_file(path)
+
+    def _apply(self):
+        self.on_apply(self._current_params()["stationary_args"])
+        self.status_lbl.configure(text="Settings applied to files started from now on")
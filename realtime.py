@@ -0,0 +1,490 @@
+"""Low-latency denoising of live audio.
+
+Reads PCM from stdin, a FIFO or a file that is still being written, cleans it
+in fixed-size frames and writes each cleaned frame as soon as it is ready:
+
+    arecord -f S16_LE -r 48000 -c 1 -t raw | python realtime.py - --rate 48000 -o - --noise-profile room.npz | aplay ...
+    python realtime.py recorder/live.wav --noise-profile room.npz -o live_cleaned.wav
+    python realtime.py take.wav --simulate -o out.wav --report latency.json   # file-backed stand-in
+
+The denoiser is the same stationary noisereduce gate as the batch engine,
+fed from a pre-captured NoiseProfile (or from the stream's first
+`noise_seconds` if none is given). Each frame is gated together with
+`context` samples of history and `lookahead` samples of future, hop-aligned
+as in chunker.py. With the default one-window lookahead the output is within
+about 1e-4 of offline processing, and latency is frame + lookahead (rounded
+up to whole frames, since input is read a frame at a time) + compute time.
+
+Latency is measured per frame, from the arrival of its first input sample to
+the write of its first output sample. A sample's arrival is the time of the
+read that delivered it, less the time the samples after it in that read take
+at the stream's rate (but never before the previous read), so samples that
+waited for the rest of their frame count that wait. An underrun is a frame
+written later than a playback clock needed it. That clock starts at the
+first output plus `--buffer-ms`.
+"""
+import argparse
+import json
+import os
+import stat
+import struct
+import sys
+import time
+from collections import deque
+
+import numpy as np
+import soundfile as sf
+
+import chunker
+import engine
+import filters
+from noise_profile import NoiseProfile, hop_length
+
+FORMATS = {  # name -> (bytes per sample, numpy dtype, full scale)
+    "s16le": (2, "<i2", 32768.0),
+    "s24le": (3, None, 8388608.0),
+    "s32le": (4, "<i4", 2147483648.0),
+    "f32le": (4, "<f4", 1.0),
+}
+FRAME_MS = 100.0
+BUFFER_MS = FRAME_MS
+TAIL_POLL_SECONDS = 0.01
+
+
+# --- sources ---
+class PipeReader:
+    """stdin or a FIFO: blocking reads, b"" once the writer closes."""
+
+    def __init__(self, fileobj):
+        self.fileobj = fileobj
+        self.fd = fileobj.fileno()
+
+    def read(self, n: int) -> bytes:
+        return os.read(self.fd, n)
+
+    def close(self):
+        self.fileobj.close()
+
+
+class TailReader:
+    """A file that another process is still appending to, like `tail -f`.
+
+    Ends once the file has not grown for `idle_timeout` seconds (never if None).
+    """
+
+    def __init__(self, path: str, idle_timeout: float = None):
+        self.f = open(path, "rb")
+        self.idle_timeout = idle_timeout
+
+    def read(self, n: int) -> bytes:
+        idle_since = time.monotonic()
+        while True:
+            data = self.f.read(n)
+            if data:
+                return data
+            if self.idle_timeout is not None and time.monotonic() - idle_since > self.idle_timeout:
+                return b""
+            time.sleep(TAIL_POLL_SECONDS)
+
+    def close(self):
+        self.f.close()
+
+
+class PacedReader:
+    """Stand-in for a live source: a finished file released at `speed` x real time."""
+
+    def __init__(self, path: str, bytes_per_second: float, speed: float = 1.0):
+        self.f = open(path, "rb")
+        self.rate = bytes_per_second * speed
+        self.start = None
+        self.sent = 0
+
+    def read(self, n: int) -> bytes:
+        if self.start is None:
+            self.start = time.monotonic()
+        due = self.start + (self.sent + n) / self.rate
+        delay = due - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        data = self.f.read(n)
+        self.sent += len(data)
+        return data
+
+    def close(self):
+        self.f.close()
+
+
+def read_exact(reader, n: int, on_read=None) -> bytes:
+    """Up to n bytes; fewer only at end of stream. `on_read(nbytes)` is called after every partial read."""
+    parts, got = [], 0
+    while got < n:
+        data = reader.read(n - got)
+        if not data:
+            break
+        parts.append(data)
+        got += len(data)
+        if on_read:
+            on_read(len(data))
+    return b"".join(parts)
+
+
+def read_wav_header(reader) -> tuple:
+    """Parse a RIFF/WAVE header sequentially (works on pipes); returns (sr, channels, format name).
+
+    The data chunk's declared size is ignored, streaming writers put 0 or
+    0xFFFFFFFF there.
+    """
+    riff = read_exact(reader, 12)
+    if len(riff) < 12 or riff[:4] not in (b"RIFF", b"RF64") or riff[8:12] != b"WAVE":
+        raise ValueError("not a WAV stream")
+    fmt = None
+    while True:
+        head = read_exact(reader, 8)
+        if len(head) < 8:
+            raise ValueError("WAV stream ended before its data chunk")
+        cid, size = head[:4], struct.unpack("<I", head[4:])[0]
+        if cid == b"data":
+            break
+        body = read_exact(reader, size + (size & 1))
+        if cid == b"fmt ":
+            tag, channels, sr = struct.unpack("<HHI", body[:8])
+            bits = struct.unpack("<H", body[14:16])[0]
+            if tag == 0xFFFE:  # WAVE_FORMAT_EXTENSIBLE: the real tag leads the subformat GUID
+                tag = struct.unpack("<H", body[24:26])[0]
+            fmt = (tag, channels, sr, bits)
+    if fmt is None:
+        raise ValueError("WAV stream has no fmt chunk")
+    tag, channels, sr, bits = fmt
+    name = {(1, 16): "s16le", (1, 24): "s24le", (1, 32): "s32le", (3, 32): "f32le"}.get((tag, bits))
+    if name is None:
+        raise ValueError(f"unsupported WAV encoding (format {tag}, {bits} bits)")
+    return sr, channels, name
+
+
+def decode_pcm(data: bytes, fmt: str, channels: int) -> np.ndarray:
+    """Interleaved PCM bytes -> mono float32."""
+    width, dtype, scale = FORMATS[fmt]
+    usable = len(data) - len(data) % (width * channels)
+    if fmt == "s24le":
+        b = np.frombuffer(data[:usable], np.uint8).reshape(-1, 3).astype(np.int32)
+        x = (b[:, 0] | (b[:, 1] << 8) | (b[:, 2] << 16))
+        x = np.where(x >= 1 << 23, x - (1 << 24), x)
+    else:
+        x = np.frombuffer(data[:usable], dtype)
+    x = x.astype(np.float32) / scale
+    return x.reshape(-1, channels).mean(axis=1) if channels > 1 else x
+
+
+def encode_pcm(y: np.ndarray, fmt: str) -> bytes:
+    width, dtype, scale = FORMATS[fmt]
+    if fmt == "f32le":
+        return y.astype("<f4").tobytes()
+    ints = np.clip(np.round(y * scale), -scale, scale - 1).astype(np.int32)
+    if fmt == "s24le":
+        return ints.astype("<i4").view(np.uint8).reshape(-1, 4)[:, :3].tobytes()
+    return ints.astype(dtype).tobytes()
+
+
+# --- sinks ---
+class RawSink:
+    def __init__(self, fileobj, fmt: str):
+        self.fileobj = fileobj
+        self.fmt = fmt
+
+    def write(self, y: np.ndarray):
+        self.fileobj.write(encode_pcm(y, self.fmt))
+        self.fileobj.flush()
+
+    def close(self):
+        if self.fileobj is not sys.stdout.buffer:
+            self.fileobj.close()
+
+
+class SoundFileSink:
+    """An audio file whose header is synced after every frame, so readers can follow it."""
+
+    def __init__(self, path: str, sr: int):
+        self.f = sf.SoundFile(path, "w", samplerate=sr, channels=1)
+
+    def write(self, y: np.ndarray):
+        self.f.write(y)
+        self.f.flush()
+
+    def close(self):
+        self.f.close()
+
+
+# --- processing ---
+class StreamDenoiser:
+    """Frame-by-frame stationary gating with hop-aligned history and lookahead.
+
+    `push(samples)` returns the cleaned frames that became ready (possibly
+    none), `flush()` the rest once the input has ended. With no profile, the
+    first `noise_samples` of the stream are used to build one.
+    """
+
+    def __init__(self, sr: int, stationary_args: dict, profile: NoiseProfile = None, frame: int = None,
+                 lookahead: int = None, context: int = None, noise_samples: int = 0, lowpass=None):
+        self.sr = sr
+        self.args = stationary_args
+        self.profile = profile
+        n_fft = stationary_args["n_fft"]
+        self.hop = hop_length(stationary_args)
+        self.frame = frame or int(sr * FRAME_MS / 1000)
+        # One window either side covers the STFT and most of the mask smoothing
+        self.lookahead = n_fft if lookahead is None else lookahead
+        self.context = n_fft if context is None else context
+        self.noise_samples = noise_samples
+        self.lowpass = lowpass or filters.Passthrough()
+        self._buf = np.zeros(0, dtype=np.float32)
+        self._buf_start = 0  # absolute index of _buf[0]
+        self._emitted = 0  # absolute index of the next frame to clean
+        self._received = 0
+
+    @property
+    def latency_samples(self) -> int:
+        """Algorithmic latency: a frame plus the lookahead in whole frames (compute time comes on top).
+
+        A frame goes out once its lookahead has been read, and input is read a
+        frame at a time, so the lookahead effectively rounds up to frames.
+        """
+        return -(-(self.frame + self.lookahead) // self.frame) * self.frame
+
+    def push(self, samples: np.ndarray) -> list:
+        self._buf = np.concatenate([self._buf, np.asarray(samples, dtype=np.float32)])
+        self._received += len(samples)
+        if self.profile is None:
+            if self._received < self.noise_samples:
+                return []
+            head = self._buf[:self.noise_samples] if self.noise_samples else self._buf
+            self.profile = NoiseProfile.from_signal(head, self.sr, self.args)
+        out = []
+        while self._received >= self._emitted + self.frame + self.lookahead:
+            out.append(self._clean(self._emitted + self.frame))
+        return out
+
+    def flush(self) -> list:
+        if self.profile is None and self._received:
+            self.profile = NoiseProfile.from_signal(self._buf, self.sr, self.args)
+        out = []
+        while self._emitted < self._received:
+            out.append(self._clean(min(self._emitted + self.frame, self._received)))
+        out.append(self.lowpass.flush())
+        return [o for o in out if len(o)]
+
+    def _clean(self, end: int) -> np.ndarray:
+        start = self._emitted
+        ctx_start = max(0, start - self.context) // self.hop * self.hop
+        ctx_end = min(self._received, end + self.lookahead)
+        window = self._buf[ctx_start - self._buf_start:ctx_end - self._buf_start]
+        reduced = chunker.reduce_chunk(window, self.sr, self.profile, self.args)
+        self._emitted = end
+        # Keep only what the next frame's context can reach
+        keep_from = max(0, end - self.context) // self.hop * self.hop
+        if keep_from > self._buf_start:
+            self._buf = self._buf[keep_from - self._buf_start:]
+            self._buf_start = keep_from
+        return self.lowpass.process(reduced[start - ctx_start:end - ctx_start])
+
+
+class LatencyStats:
+    def __init__(self, sr: int, buffer_seconds: float):
+        self.sr = sr
+        self.buffer = buffer_seconds
+        self.latencies = []
+        self.underruns = 0
+        self.late_seconds = 0.0
+        self.compute_seconds = 0.0
+        self.written = 0  # output samples so far
+        self._arrivals = deque()  # (input samples received, arrival time), one per read
+        self._previous_read = None
+        self._clock = None
+
+    def arrived(self, received: int, t: float):
+        self._arrivals.append((received, t))
+
+    def _arrival_of(self, sample: int) -> float:
+        while len(self._arrivals) > 1 and self._arrivals[0][0] <= sample:
+            self._previous_read = self._arrivals.popleft()[1]
+        received, t = self._arrivals[0]
+        arrival = t - (received - 1 - sample) / self.sr
+        return arrival if self._previous_read is None else max(arrival, self._previous_read)
+
+    def wrote(self, n: int, t: float):
+        if n == 0:
+            return
+        self.latencies.append(t - self._arrival_of(self.written))
+        if self._clock is None:
+            self._clock = t + self.buffer
+        due = self._clock + self.written / self.sr
+        if t > due:
+            self.underruns += 1
+            self.late_seconds += t - due
+            self._clock += t - due  # playback would resume from here
+        self.written += n
+
+    def summary(self) -> dict:
+        lat = np.array(self.latencies) * 1000 if self.latencies else np.zeros(1)
+        audio = self.written / self.sr
+        return {
+            "audio_seconds": round(audio, 3),
+            "frames": len(self.latencies),
+            "latency_ms": {"mean": round(float(lat.mean()), 1), "p50": round(float(np.percentile(lat, 50)), 1),
+                           "p95": round(float(np.percentile(lat, 95)), 1), "max": round(float(lat.max()), 1)},
+            "underruns": self.underruns,
+            "late_ms_total": round(self.late_seconds * 1000, 1),
+            "compute_rtf": round(self.compute_seconds / audio, 4) if audio else None,
+        }
+
+    def line(self) -> str:
+        s = self.summary()
+        lat = s["latency_ms"]
+        return (f"{s['audio_seconds']:.1f}s out, latency p50 {lat['p50']:.0f} ms / p95 {lat['p95']:.0f} ms / "
+                f"max {lat['max']:.0f} ms, {s['underruns']} underrun(s), compute RTF {s['compute_rtf']}")
+
+
+def run(reader, sr: int, channels: int, fmt: str, sink, denoiser: StreamDenoiser, stats: LatencyStats,
+        stats_interval: float = 5.0, should_stop=None) -> dict:
+    """Pump frames from reader through the denoiser into sink until the input ends."""
+    sample_bytes = channels * FORMATS[fmt][0]
+    frame_bytes = denoiser.frame * sample_bytes
+    received = 0  # bytes
+    next_report = time.monotonic() + stats_interval if stats_interval else None
+
+    def arrived(n):
+        nonlocal received
+        received += n
+        stats.arrived(received // sample_bytes, time.monotonic())
+
+    def emit(frames):
+        for y in frames:
+            sink.write(y)
+            stats.wrote(len(y), time.monotonic())
+
+    while not (should_stop and should_stop()):
+        data = read_exact(reader, frame_bytes, arrived)
+        if not data:
+            break
+        x = decode_pcm(data, fmt, channels)
+        t0 = time.perf_counter()
+        frames = denoiser.push(x)
+        stats.compute_seconds += time.perf_counter() - t0
+        emit(frames)
+        if next_report and time.monotonic() >= next_report:
+            print(stats.line(), file=sys.stderr)
+            next_report += stats_interval
+        if len(data) < frame_bytes:
+            break
+    t0 = time.perf_counter()
+    frames = denoiser.flush()
+    stats.compute_seconds += time.perf_counter() - t0
+    emit(frames)
+    return stats.summary()
+
+
+def load_profile(spec: str, sr: int, params: dict) -> NoiseProfile:
+    """A saved .npz, or a reference recording whose head is pure noise."""
+    path = spec if spec.lower().endswith(".npz") else engine.make_profile(spec, dict(params, reduced_rate=False))
+    profile = NoiseProfile.load(path)
+    if not profile.matches(sr, params["stationary_args"]):
+        raise ValueError(f"Noise profile {path} was made at sr={profile.sr}, n_fft={profile.n_fft}; "
+                         f"the stream is sr={sr}")
+    return profile
+
+
+def open_input(args):
+    """Returns (reader, sr, channels, format)."""
+    if args.source == "-":
+        reader = PipeReader(sys.stdin.buffer)
+    elif stat.S_ISFIFO(os.stat(args.source).st_mode):
+        reader = PipeReader(open(args.source, "rb"))
+    elif args.simulate:
+        info = sf.info(args.source)
+        width = FORMATS.get(args.format, FORMATS["s16le"])[0]
+        if info.format == "WAV":
+            width = {"PCM_16": 2, "PCM_24": 3, "PCM_32": 4, "FLOAT": 4}.get(info.subtype, width)
+        reader = PacedReader(args.source, info.samplerate * info.channels * width, args.speed)
+    else:
+        reader = TailReader(args.source, args.idle_timeout)
+
+    if args.raw:
+        return reader, args.rate, args.channels, args.format
+    sr, channels, fmt = read_wav_header(reader)
+    return reader, sr, channels, fmt
+
+
+def open_output(args, sr: int):
+    if args.output == "-":
+        return RawSink(sys.stdout.buffer, args.output_format)
+    if os.path.exists(args.output) and stat.S_ISFIFO(os.stat(args.output).st_mode):
+        return RawSink(open(args.output, "wb"), args.output_format)
+    return SoundFileSink(args.output, sr)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(description="Denoise a live stream with bounded latency.")
+    p.add_argument("source", help="'-' for stdin, a FIFO, or a (growing) WAV file.")
+    p.add_argument("-o", "--output", required=True,
+                   help="'-' for raw PCM on stdout, a FIFO (raw PCM), or an audio file.")
+    p.add_argument("--raw", action="store_true",
+                   help="Input is headerless PCM described by --rate/--channels/--format "
+                        "(default: a WAV header is expected).")
+    p.add_argument("--rate", type=int, default=48000, help="Sample rate of --raw input.")
+    p.add_argument("--channels", type=int, default=1, help="Channels of --raw input (downmixed to mono).")
+    p.add_argument("--format", choices=FORMATS, default="s16le", help="Sample format of --raw input.")
+    p.add_argument("--output-format", choices=FORMATS, default="s16le", help="Sample format of raw output.")
+    p.add_argument("--noise-profile", default=None, metavar="PATH",
+                   help="Saved .npz profile or a reference recording that starts with pure noise "
+                        "(default: the stream's first seconds).")
+    p.add_argument("--frame-ms", type=float, default=FRAME_MS, help="Frame length (default: %(default)s).")
+    p.add_argument("--lookahead-ms", type=float, default=None,
+                   help="Future samples gated with each frame (default: one STFT window). "
+                        "Less lowers latency at some cost in accuracy at frame edges.")
+    p.add_argument("--buffer-ms", type=float, default=BUFFER_MS,
+                   help="Playback buffer assumed when counting underruns (default: %(default)s).")
+    p.add_argument("--filter", choices=filters.MODES, default="fir", dest="filter_mode",
+                   help="Lowpass stage; the linear-phase FIR (default) adds only a few ms.")
+    p.add_argument("--simulate", action="store_true",
+                   help="Treat the source file as a live feed: release it at real-time speed.")
+    p.add_argument("--speed", type=float, default=1.0, help="With --simulate, playback speed factor.")
+    p.add_argument("--idle-timeout", type=float, default=None,
+                   help="Stop tailing a file after it stops growing for this many seconds (default: never).")
+    p.add_argument("--stats-interval", type=float, default=5.0,
+                   help="Seconds between latency reports on stderr; 0 to disable.")
+    p.add_argument("--report", default=None, metavar="PATH", help="Write the final latency summary as JSON.")
+    return p
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    params = engine.default_params()
+    reader, sr, channels, fmt = open_input(args)
+    stationary_args = params["stationary_args"]
+    profile = load_profile(args.noise_profile, sr, params) if args.noise_profile else None
+    lowpass = filters.make_lowpass(sr, params["cutoff_hz"], params["filter_order"], args.filter_mode)
+    denoiser = StreamDenoiser(sr, stationary_args, profile,
+                              frame=max(1, int(sr * args.frame_ms / 1000)),
+                              lookahead=None if args.lookahead_ms is None else int(sr * args.lookahead_ms / 1000),
+                              noise_samples=int(params["noise_seconds"] * sr), lowpass=lowpass)
+    print(f"Streaming {sr} Hz, {channels} ch {fmt}: frame {args.frame_ms:g} ms, "
+          f"algorithmic latency {1000 * denoiser.latency_samples / sr:.0f} ms", file=sys.stderr)
+
+    sink = open_output(args, sr)
+    stats = LatencyStats(sr, args.buffer_ms / 1000)
+    try:
+        summary = run(reader, sr, channels, fmt, sink, denoiser, stats, args.stats_interval)
+    except KeyboardInterrupt:
+        summary = stats.summary()
+    finally:
+        sink.close()
+        reader.close()
+    print(f"Finished: {stats.line()}", file=sys.stderr)
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump({"sr": sr, "frame_ms": args.frame_ms,
+                       "lookahead_ms": round(1000 * denoiser.lookahead / sr, 1), **summary}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""Reduced-rate processing helpers.
+
+Everything above the final 10 kHz lowpass is thrown away, so denoising a
+48/96 kHz file at full rate wastes most of the STFT work. These helpers pick
+the lowest rate that keeps the passband and rescale the STFT sizes so every
+window still covers the same length of time.
+
+Resampling goes through soxr, which librosa already depends on. It is a
+high-quality polyphase/FFT resampler, and its ResampleStream keeps filter
+state between blocks, so the streaming path has no seams.
+"""
+import math
+
+import numpy as np
+import soxr
+
+QUALITY = "HQ"
+# Headroom over 2 x cutoff for the resampler's transition band
+PASSBAND_MARGIN = 1.1
+_FAMILIES = (
+    (11025, (22050, 44100, 88200, 176400)),
+    (8000, (16000, 24000, 32000, 48000, 96000, 192000)),
+)
+
+
+def processing_rate(sr: int, cutoff_hz: float) -> int:
+    """Lowest rate in the source's family (44.1k or 48k) whose Nyquist clears the cutoff."""
+    needed = 2 * cutoff_hz * PASSBAND_MARGIN
+    for base, rates in _FAMILIES:
+        if sr % base == 0:
+            for r in rates:
+                if r >= needed:
+                    return min(r, sr)
+            return sr
+    return min(sr, int(math.ceil(needed / 1000.0)) * 1000)
+
+
+def scale_stationary_args(stationary_args: dict, sr: int, work_sr: int) -> dict:
+    """Scale n_fft/win/hop by work_sr/sr (to a power of two) so windows keep their duration."""
+    if work_sr == sr:
+        return stationary_args
+    ratio = work_sr / sr
+    args = dict(stationary_args)
+    for key in ("n_fft", "win_length", "hop_length"):
+        if args.get(key):
+            args[key] = max(64, 2 ** int(round(math.log2(args[key] * ratio))))
+    return args
+
+
+def resample(y: np.ndarray, sr: int, target_sr: int) -> np.ndarray:
+    """Resample a mono signal or a channels × samples array."""
+    if sr == target_sr or y.shape[-1] == 0:
+        return y
+    y = np.asarray(y, dtype=np.float32)
+    if y.ndim == 2:
+        return np.ascontiguousarray(soxr.resample(y.T, sr, target_sr, quality=QUALITY).T)
+    return soxr.resample(y, sr, target_sr, quality=QUALITY)
+
+
+class BlockResampler:
+    """Stateful resampler for block streams; call flush() once after the last block."""
+
+    def __init__(self, sr: int, target_sr: int, channels: int = 1):
+        self.passthrough = sr == target_sr
+        self.channels = channels
+        self._stream = None if self.passthrough else soxr.ResampleStream(sr, target_sr, channels,
+                                                                          dtype="float32", quality=QUALITY)
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        if self.passthrough:
+            return block
+        return self._stream.resample_chunk(np.asarray(block, dtype=np.float32), last=False)
+
+    def flush(self) -> np.ndarray:
+        empty = np.zeros((0, self.channels) if self.channels > 1 else 0, dtype=np.float32)
+        if self.passthrough:
+            return empty
+        return self._stream.resample_chunk(empty, last=True)
@@ -0,0 +1,158 @@
+"""Content-addressed cache of finished outputs.
+
+Entries are keyed on a fast content hash of the input plus every parameter
+that affects the output, so re-running an unchanged folder costs one hash
+per file instead of a decode + denoise. A small JSON index tracks entry
+sizes and last use; the least recently used entries are evicted once the
+cache grows past its size limit.
+"""
+import json
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+
+from hashing import fast_file_hash, params_hash
+from metrics import stage
+from pipeline import atomic_output
+from settings import default_params, get_output_path
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to the in-process lock only
+    fcntl = None
+
+CACHE_DIR = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"),
+                         "noise_reducer", "results")
+DEFAULT_MAX_BYTES = 5 * 1024 ** 3
+FORMAT_VERSION = 2  # 2: multichannel files keep their channels
+# Parameters that change how the work is done, not what comes out
+_NON_OUTPUT_PARAMS = ("chunk_workers", "concurrent_jobs", "profile_cache_dir", "checkpoint_seconds")
+
+
+def output_params(params: dict) -> dict:
+    """The subset of params that determines the output, with a shared profile reduced to its hash."""
+    out = {k: v for k, v in params.items() if k not in _NON_OUTPUT_PARAMS}
+    if out.get("noise_profile"):
+        out["noise_profile"] = fast_file_hash(out["noise_profile"])
+    out["_version"] = FORMAT_VERSION
+    return out
+
+
+class ResultCache:
+    def __init__(self, root: str = CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(root, "index.json")
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+        with self._locked_index() as index:
+            self._evict(index)  # the limit may have been lowered since the last run
+
+    def key(self, file_path: str, params: dict, out_path: str) -> str:
+        ext = os.path.splitext(out_path)[1].lower()
+        return f"{fast_file_hash(file_path)}-{params_hash(output_params(params))}{ext}"
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key)
+
+    @contextmanager
+    def _locked_index(self):
+        """Read-modify-write access to the index, serialised across threads and (on POSIX) processes."""
+        with self._lock:
+            lock_file = open(self.index_path + ".lock", "a+")
+            try:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    with open(self.index_path, "r", encoding="utf-8") as f:
+                        index = json.load(f)
+                except (OSError, ValueError):
+                    index = {}
+                yield index
+                tmp = self.index_path + ".tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(index, f)
+                os.replace(tmp, self.index_path)
+            finally:
+                lock_file.close()
+
+    def fetch(self, key: str, out_path: str) -> bool:
+        """Copy a cached output to out_path. Returns True on a hit."""
+        src = self._entry_path(key)
+        with self._locked_index() as index:
+            entry = index.get(key)
+            if entry is None or not os.path.exists(src):
+                index.pop(key, None)
+                self.misses += 1
+                return False
+            entry["last_used"] = time.time()
+        with atomic_output(out_path) as tmp:
+            shutil.copyfile(src, tmp)
+        self.hits += 1
+        return True
+
+    def store(self, key: str, out_path: str):
+        """Add a finished output to the cache and evict LRU entries over the size limit."""
+        dst = self._entry_path(key)
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        with atomic_output(dst) as tmp:
+            shutil.copyfile(out_path, tmp)
+        with self._locked_index() as index:
+            index[key] = {"size": os.path.getsize(dst), "last_used": time.time()}
+            self._evict(index)
+
+    def _evict(self, index: dict):
+        total = sum(e["size"] for e in index.values())
+        for key, entry in sorted(index.items(), key=lambda kv: kv[1]["last_used"]):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(self._entry_path(key))
+            except OSError:
+                pass
+            total -= entry["size"]
+            del index[key]
+
+    def summary(self) -> str:
+        return f"cache: {self.hits} hit(s), {self.misses} miss(es)"
+
+
+def process_cached(file_path: str, out_path: str = None, params: dict = None, cache=None,
+                   progress=None, should_cancel=None, metrics=None, process=None):
+    """process_file behind a ResultCache. Returns (out_path, hit); a hit skips decoding entirely.
+
+    `process` replaces engine.process_file for misses, e.g. job_process.process_file,
+    which keeps the DSP stack out of this process entirely.
+    """
+    params = params or default_params()
+    out_path = out_path or get_output_path(file_path)
+    if process is None:
+        from engine import process_file as process
+    if cache is None:
+        return process(file_path, out_path, params, progress, should_cancel, metrics), False
+
+    with stage(metrics, "cache"):
+        key = cache.key(file_path, params, out_path)
+        hit = cache.fetch(key, out_path)
+    if hit:
+        if metrics is not None:
+            metrics.cache_hit = True
+        if progress:
+            progress(1.0)
+        return out_path, True
+    process(file_path, out_path, params, progress, should_cancel, metrics)
+    with stage(metrics, "cache"):
+        store_result(cache, key, out_path)
+    return out_path, False
+
+
+def store_result(cache, key: str, out_path: str):
+    """Add an output to the cache; a full disk or similar must not fail the job itself."""
+    try:
+        cache.store(key, out_path)
+    except OSError as e:
+        print(f"Could not cache {out_path}: {e}")
@@ -0,0 +1,186 @@
+import os
+import threading
+
+from settings import NOISE_SCAN_SECONDS
+
+POLICIES = ("fifo", "shortest")
+BYTES_PER_SAMPLE = 4  # float32 after decode
+# Streaming jobs, calibrated against peak RSS of 44.1/48 kHz runs with 5-60 s
+# blocks: the spectral gate's STFT working set on one block dominates (the
+# queued and overlap-add copies of the samples are a small part of it), the
+# noise scan keeps its head plus the chunks planned from it, and each job
+# has some fixed overhead (profiles, filters, codec buffers)
+STREAM_BYTES_PER_BLOCK_SAMPLE = 480
+STREAM_BYTES_PER_SCAN_SAMPLE = 2 * BYTES_PER_SAMPLE
+STREAM_JOB_BYTES = 32 * 1024 ** 2
+MAX_OVERTAKES = 8  # "shortest": a job passed over this often is started next
+
+
+def probe_audio(file_path: str):
+    """Return (duration_s, sr, channels) without decoding the file."""
+    import soundfile as sf
+    try:
+        info = sf.info(file_path)
+        return info.duration, info.samplerate, info.channels
+    except Exception:
+        pass
+    # MP3/M4A etc. go through audioread, which librosa already depends on
+    import audioread
+    with audioread.audio_open(file_path) as f:
+        return f.duration, f.samplerate, f.channels
+
+
+def estimate_decoded_bytes(file_path: str, block_seconds: float = None, scan_seconds: float = 0) -> int:
+    """estimate_bytes for a file on disk; 0 if the file can't be probed."""
+    try:
+        duration, sr, channels = probe_audio(file_path)
+    except Exception:
+        return 0
+    return estimate_bytes(duration, sr, channels, block_seconds, scan_seconds)
+
+
+def estimate_bytes(duration: float, sr: int, channels: int, block_seconds: float = None,
+                   scan_seconds: float = 0) -> int:
+    """duration x sr x channels x 4 bytes.
+
+    With block_seconds (streaming mode) the job is charged for denoising one
+    block plus buffering scan_seconds for the noise window instead, per
+    channel since channels may be denoised side by side.
+    """
+    if block_seconds:
+        block = min(duration, block_seconds) * sr
+        scan = min(duration, scan_seconds) * sr
+        return int(STREAM_JOB_BYTES + channels * (block * STREAM_BYTES_PER_BLOCK_SAMPLE
+                                                  + scan * STREAM_BYTES_PER_SCAN_SAMPLE))
+    return int(duration * sr * channels * BYTES_PER_SAMPLE)
+
+
+def default_memory_budget() -> int:
+    """A quarter of physical RAM; the pipeline holds several copies of each decoded file."""
+    try:
+        total = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (ValueError, OSError, AttributeError):
+        total = 8 * 1024 ** 3
+    return total // 4
+
+
+class JobScheduler:
+    """Admits queued jobs under a concurrency limit and a decoded-memory budget.
+
+    The scheduler only does bookkeeping: callers `submit` keys, ask
+    `take_ready()` for the keys they may start now and report back with
+    `finish()`. A job larger than the whole budget is still admitted once
+    nothing else is running, so it can never block the queue forever.
+
+    Under "shortest", a job that smaller ones have overtaken MAX_OVERTAKES
+    times goes first and holds the queue until it fits, so large files are
+    not starved by a steady stream of small ones. Set block_seconds (and
+    scan_seconds, see estimate_decoded_bytes) when jobs run in streaming mode
+    so they are charged their block footprint; configure() does it from params.
+    """
+
+    def __init__(self, max_concurrent: int = None, memory_budget: int = None, policy: str = "fifo",
+                 block_seconds: float = None, scan_seconds: float = 0):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown policy: {policy}")
+        self.max_concurrent = max(1, max_concurrent or os.cpu_count() or 1)
+        self.memory_budget = memory_budget or default_memory_budget()
+        self.policy = policy
+        self.block_seconds = block_seconds
+        self.scan_seconds = scan_seconds
+        self._lock = threading.Lock()
+        self._pending = []  # [(seq, key, est_bytes)]
+        self._running = {}  # key -> est_bytes
+        self._seq = 0
+        self._overtaken = {}  # key -> times a later job started first
+
+    def configure(self, params: dict):
+        """Charge later submissions for the mode params select (whole decoded files or streaming blocks)."""
+        from engine import wants_noise_window
+        streaming = bool(params.get("streaming"))
+        self.block_seconds = params["block_seconds"] if streaming else None
+        self.scan_seconds = 0
+        if streaming and wants_noise_window(params):
+            scan = params.get("noise_scan_seconds")
+            self.scan_seconds = NOISE_SCAN_SECONDS if scan is None else scan  # as engine.scan_limit clamps it
+
+    def submit(self, key, est_bytes: int = None):
+        if est_bytes is None:
+            est_bytes = estimate_decoded_bytes(key, self.block_seconds, self.scan_seconds)  # probe outside the lock
+        with self._lock:
+            if key in self._running or any(k == key for _, k, _ in self._pending):
+                return
+            self._pending.append((self._seq, key, est_bytes))
+            self._seq += 1
+
+    def cancel(self, key) -> bool:
+        """Drop a job that has not started yet. Returns True if it was pending."""
+        with self._lock:
+            before = len(self._pending)
+            self._pending = [j for j in self._pending if j[1] != key]
+            self._overtaken.pop(key, None)
+            return len(self._pending) != before
+
+    def clear_pending(self) -> list:
+        with self._lock:
+            keys = [k for _, k, _ in self._pending]
+            self._pending.clear()
+            self._overtaken.clear()
+            return keys
+
+    def take_ready(self) -> list:
+        """Move every job that fits right now from pending to running and return their keys."""
+        with self._lock:
+            if self.policy == "shortest":
+                # Overdue jobs first, oldest first; then smallest first
+                order = sorted(self._pending, key=lambda j: (
+                    (0, 0, j[0]) if self._overdue(j[1]) else (1, j[2], j[0])))
+            else:
+                order = list(self._pending)
+
+            started = []
+            newest = -1
+            used = sum(self._running.values())
+            for job in order:
+                if len(self._running) >= self.max_concurrent:
+                    break
+                seq, key, est = job
+                if used + est > self.memory_budget and self._running:
+                    if self.policy == "fifo" or self._overdue(key):
+                        break  # don't let later jobs overtake the head (or an overdue job)
+                    continue
+                self._running[key] = est
+                used += est
+                self._pending.remove(job)
+                self._overtaken.pop(key, None)
+                started.append(key)
+                newest = max(newest, seq)
+            for seq, key, _ in self._pending:
+                if seq < newest:
+                    self._overtaken[key] = self._overtaken.get(key, 0) + 1
+            return started
+
+    def _overdue(self, key) -> bool:
+        return self._overtaken.get(key, 0) >= MAX_OVERTAKES
+
+    def finish(self, key):
+        with self._lock:
+            self._running.pop(key, None)
+
+    def is_pending(self, key) -> bool:
+        with self._lock:
+            return any(k == key for _, k, _ in self._pending)
+
+    @property
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    @property
+    def running_count(self) -> int:
+        with self._lock:
+            return len(self._running)
+
+    def is_idle(self) -> bool:
+        with self._lock:
+            return not self._pending and not self._running
@@ -0,0 +1,59 @@
+"""Processing parameters and output naming.
+
+Kept free of DSP imports so front-ends can build their settings and queue
+files without loading numpy/scipy/librosa; engine re-exports everything here.
+"""
+import os
+
+STATIONARY_ARGS = {
+    "n_std_thresh_stationary": 1.3,
+    "prop_decrease": 1,
+    "n_fft": 8192,
+    "stationary": True
+}
+NOISE_SECONDS = 0.8
+NOISE_SCAN_SECONDS = 120.0  # the automatic noise window is searched for in this much of each file's start
+LOWPASS_HZ = 10000
+FILTER_ORDER = 8
+STREAM_BLOCK_SECONDS = 30.0
+OVERLAP_SECONDS = 0.5
+CROSSFADE_SECONDS = 0.1
+CHECKPOINT_SECONDS = 600.0  # only files at least this long are checkpointed
+PROFILE_DIR = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"),
+                           "noise_reducer", "profiles")
+
+
+def get_output_path(file_path: str) -> str:
+    folder, name = os.path.split(file_path)
+    base, ext = os.path.splitext(name)
+    return os.path.join(folder, f"{base}_cleaned{ext}")
+
+
+def work_dir_for(out_path: str) -> str:
+    """Hidden sidecar directory holding an unfinished job's checkpoint (see checkpoint.py)."""
+    folder, name = os.path.split(os.path.abspath(out_path))
+    return os.path.join(folder, f".{name}.work")
+
+
+def default_params() -> dict:
+    """Return a fresh copy of the default processing parameters."""
+    return {
+        "stationary_args": dict(STATIONARY_ARGS),
+        "noise_seconds": NOISE_SECONDS,
+        "cutoff_hz": LOWPASS_HZ,
+        "filter_order": FILTER_ORDER,
+        "filter_mode": "zerophase",  # see filters.MODES
+        "streaming": False,
+        "block_seconds": STREAM_BLOCK_SECONDS,
+        "overlap_seconds": OVERLAP_SECONDS,
+        "crossfade_seconds": CROSSFADE_SECONDS,
+        "chunk_workers": 1,
+        "concurrent_jobs": 1,  # files processed side by side; caps a multichannel job's pool (see engine)
+        "noise_profile": None,  # path to a saved .npz profile shared by every file
+        "noise_window": "auto",  # "auto": quietest steady stretch (see noise_window.py); "head": first noise_seconds
+        "noise_scan_seconds": NOISE_SCAN_SECONDS,
+        "profile_cache_dir": PROFILE_DIR,
+        "reduced_rate": False,  # denoise at the lowest rate that keeps the lowpass passband
+        "restore_rate": True,  # resample back to the source rate when writing
+        "checkpoint_seconds": CHECKPOINT_SECONDS,  # resumable chunks for files this long; None disables
+    }
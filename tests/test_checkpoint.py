@@ -0,0 +1,44 @@
+import os
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+import engine
+import settings
+from metrics import JobMetrics
+from pipeline import JobCancelled
+
+SR = 44100
+
+
+@pytest.fixture
+def long_wav(tmp_path):
+    path = str(tmp_path / "in.wav")
+    rng = np.random.default_rng(0)
+    t = np.arange(20 * SR) / SR
+    y = 0.3 * np.sin(2 * np.pi * 440 * t) * (t % 4 > 2) + rng.normal(0, 0.05, len(t))
+    sf.write(path, np.stack([y, y[::-1]], axis=1).astype(np.float32), SR)
+    return path
+
+
+@pytest.mark.parametrize("mode", [dict(streaming=False), dict(streaming=True, block_seconds=2.0)])
+def test_resumed_run_is_bit_identical(long_wav, tmp_path, mode):
+    params = dict(settings.default_params(), chunk_workers=1, profile_cache_dir=None,
+                  checkpoint_seconds=1.0, noise_scan_seconds=4.0, **mode)
+    reference = engine.process_file(long_wav, str(tmp_path / "ref_cleaned.wav"), params)
+
+    out = str(tmp_path / "in_cleaned.wav")
+    calls = []
+    with pytest.raises(JobCancelled):
+        engine.process_file(long_wav, out, params, progress=calls.append, should_cancel=lambda: len(calls) >= 5)
+    work_dir = settings.work_dir_for(out)
+    assert not os.path.exists(out)
+    assert any(name.startswith("chunk") for name in os.listdir(work_dir))
+
+    metrics = JobMetrics(long_wav)
+    engine.process_file(long_wav, out, params, metrics=metrics)
+    assert metrics.extra.get("resumed_chunks", 0) > 0
+    with open(reference, "rb") as a, open(out, "rb") as b:
+        assert a.read() == b.read()
+    assert not os.path.exists(work_dir)
@@ -0,0 +1,40 @@
+import noisereduce as nr
+import numpy as np
+import pytest
+
+import chunker
+from noise_profile import NoiseProfile
+from settings import CROSSFADE_SECONDS, OVERLAP_SECONDS, STATIONARY_ARGS
+
+SR = 44100
+
+
+def _signal(seconds, seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.arange(seconds * SR) / SR
+    tone = 0.3 * np.sin(2 * np.pi * 440 * t) * (np.sin(2 * np.pi * 0.2 * t) > 0)
+    return (tone + rng.normal(0, 0.05, len(t))).astype(np.float32)
+
+
+@pytest.mark.parametrize("n_chunks", [2, 7])
+def test_overlap_add_matches_unchunked(n_chunks):
+    y = _signal(10)
+    noise = y[:int(0.8 * SR)]
+    whole = nr.reduce_noise(y=y, sr=SR, y_noise=noise, chunk_size=None, **STATIONARY_ARGS)
+    profile = NoiseProfile.from_signal(noise, SR, STATIONARY_ARGS)
+    chunked = chunker.overlap_add(y, SR, profile, STATIONARY_ARGS, n_chunks,
+                                  overlap=int(OVERLAP_SECONDS * SR), crossfade=int(CROSSFADE_SECONDS * SR))
+    assert chunked.shape == y.shape
+    assert np.max(np.abs(whole - y)) > 0.01  # the gate actually ran
+    assert np.max(np.abs(chunked - whole)) < 1e-6
+
+
+def test_overlap_add_channels_match_mono_runs():
+    y = np.stack([_signal(12, seed=1), _signal(12, seed=2)])
+    profiles = [NoiseProfile.from_signal(ch[:int(0.8 * SR)], SR, STATIONARY_ARGS) for ch in y]
+    kwargs = dict(overlap=int(OVERLAP_SECONDS * SR), crossfade=int(CROSSFADE_SECONDS * SR))
+    stereo = chunker.overlap_add(y, SR, profiles, STATIONARY_ARGS, 4, **kwargs)
+    for c in range(2):
+        mono = chunker.overlap_add(y[c], SR, profiles[c], STATIONARY_ARGS, 4, **kwargs)
+        assert np.array_equal(stereo[c], mono)
+    assert np.max(np.abs(stereo - y)) > 0.01
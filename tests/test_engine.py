@@ -0,0 +1,15 @@
+import engine
+
+
+def test_channel_workers_stay_within_the_job_share(monkeypatch):
+    monkeypatch.setattr(engine.os, "cpu_count", lambda: 8)
+
+    def workers(chunk_workers, concurrent_jobs, channels):
+        return engine._channel_workers({"chunk_workers": chunk_workers, "concurrent_jobs": concurrent_jobs}, channels)
+
+    assert workers(1, 8, 2) == 1  # -j 8: every core already has a file
+    assert workers(4, 2, 2) == 4
+    assert workers(4, 1, 2) == 8  # one file: its channels may use the spare cores
+    assert workers(2, 1, 6) == 8
+    assert workers(4, 2, 1) == 4
+    assert workers(3, 8, 2) == 3  # an explicit --chunk-workers is honoured
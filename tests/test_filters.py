@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+import scipy.signal
+
+import filters
+from settings import FILTER_ORDER, LOWPASS_HZ
+
+SR = 44100
+
+
+def _stream(filt, y, sizes):
+    """Feed y through filt in blocks cycling through `sizes`, then flush."""
+    out, pos, i = [], 0, 0
+    while pos < len(y):
+        out.append(filt.process(y[pos:pos + sizes[i % len(sizes)]]))
+        pos += sizes[i % len(sizes)]
+        i += 1
+    out.append(filt.flush())
+    return np.concatenate(out)
+
+
+@pytest.mark.parametrize("sizes", [[filters.BLOCK], [1000, 37, 4096], [50]])
+def test_zerophase_matches_sosfiltfilt_away_from_edges(sizes):
+    y = np.random.default_rng(0).normal(0, 0.1, 3 * SR).astype(np.float32)
+    sos = filters.design_sos(SR, LOWPASS_HZ, FILTER_ORDER)
+    filt = filters.ZeroPhaseSos(sos)
+    out = _stream(filt, y, sizes)
+    assert out.dtype == np.float32 and len(out) == len(y)
+
+    reference = scipy.signal.sosfiltfilt(sos, y.astype(np.float64))
+    edge = filt.lookahead
+    assert np.max(np.abs(out[edge:-edge] - reference[edge:-edge])) < 1e-6
+
+
+def test_fir_is_delay_compensated():
+    y = np.zeros(SR, dtype=np.float32)
+    y[SR // 2] = 1.0
+    filt = filters.make_lowpass(SR, LOWPASS_HZ, FILTER_ORDER, "fir")
+    out = _stream(filt, y, [1000])
+    assert len(out) == len(y)
+    assert np.argmax(out) == SR // 2
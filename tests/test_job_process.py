@@ -0,0 +1,44 @@
+import os
+import signal
+import threading
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+import job_process
+import settings
+
+
+@pytest.fixture
+def noisy_wav(tmp_path):
+    path = str(tmp_path / "in.wav")
+    sf.write(path, np.random.default_rng(0).normal(0, 0.05, 20 * 48000).astype(np.float32), 48000)
+    return path
+
+
+def test_killed_job_reports_error(noisy_wav, tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    params = dict(settings.default_params(), profile_cache_dir=None, checkpoint_seconds=None)
+
+    def kill_child(_):
+        for proc in list(job_process._live):
+            if proc.exitcode is None:
+                os.kill(proc.pid, signal.SIGKILL)
+
+    outcome = {}
+
+    def run():
+        try:
+            job_process.process_file(noisy_wav, str(tmp_path / "out.wav"), params, progress=kill_child)
+            outcome["result"] = "returned"
+        except Exception as e:
+            outcome["result"] = e
+
+    t = threading.Thread(target=run, daemon=True)
+    t.start()
+    t.join(60)
+    assert not t.is_alive(), "process_file hung after its job process was killed"
+    assert isinstance(outcome["result"], RuntimeError)
+    assert "exited with code" in str(outcome["result"])
+    assert not os.path.exists(tmp_path / "out.wav")
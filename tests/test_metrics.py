@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+import metrics
+from metrics import JobMetrics, SharedPeak
+
+MB = 1024 ** 2
+pytestmark = pytest.mark.skipif(not metrics.reset_peak_rss(), reason="peak RSS can't be reset on this platform")
+
+
+def _touch(n_bytes):
+    a = np.ones(n_bytes // 8)
+    del a
+
+
+def test_job_peak_is_per_job():
+    big, small = JobMetrics("big"), JobMetrics("small")
+    with big.job():
+        _touch(400 * MB)
+    with small.job():
+        _touch(10 * MB)
+    assert big.peak_rss - small.peak_rss > 300 * MB
+
+
+def test_shared_peak_credits_overlapping_jobs():
+    peaks = SharedPeak()
+    a, b, c = JobMetrics("a"), JobMetrics("b"), JobMetrics("c")
+    peaks.start(a)
+    peaks.start(b)
+    _touch(400 * MB)  # while a and b both run
+    peaks.end(a)
+    peaks.end(b)
+    peaks.start(c)
+    _touch(10 * MB)
+    peaks.end(c)
+    assert abs(a.peak_rss - b.peak_rss) < 50 * MB
+    assert a.peak_rss - c.peak_rss > 300 * MB
@@ -0,0 +1,21 @@
+import os
+import stat
+
+import pipeline
+
+
+def _mode(path):
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+
+def test_atomic_output_mode(tmp_path):
+    out = str(tmp_path / "out_cleaned.wav")
+    with pipeline.atomic_output(out) as tmp:
+        open(tmp, "w").close()
+    assert _mode(out) == 0o666 & ~pipeline._UMASK
+
+    os.chmod(out, 0o640)
+    with pipeline.atomic_output(out) as tmp:
+        open(tmp, "w").close()
+    assert _mode(out) == 0o640
+    assert os.listdir(tmp_path) == ["out_cleaned.wav"]
@@ -0,0 +1,45 @@
+import io
+
+import pytest
+
+import realtime
+
+SR = 1000
+
+
+def test_arrival_counts_the_wait_for_the_rest_of_the_frame():
+    stats = realtime.LatencyStats(SR, buffer_seconds=1.0)
+    # Frames of 100 samples, each read in one piece as its last sample arrives
+    for k in range(1, 6):
+        stats.arrived(100 * k, 0.1 * k)
+    stats.wrote(100, 0.35)  # frame 0: its first sample arrived at ~0.001 s
+    stats.wrote(100, 0.45)
+    assert stats.latencies[0] == pytest.approx(0.35 - 0.001)
+    assert stats.latencies[1] == pytest.approx(0.45 - 0.101)
+
+
+def test_arrival_is_never_before_the_previous_read():
+    stats = realtime.LatencyStats(SR, buffer_seconds=1.0)
+    stats.arrived(100, 0.1)
+    stats.arrived(400, 0.15)  # a backlog: 300 samples in one read, 50 ms after the last
+    stats.wrote(100, 0.2)
+    stats.wrote(100, 0.3)
+    assert stats.latencies[1] == pytest.approx(0.3 - 0.1)
+
+
+def test_read_exact_reports_partial_reads():
+    class Trickle:
+        def __init__(self, data):
+            self.f = io.BytesIO(data)
+
+        def read(self, n):
+            return self.f.read(min(n, 3))
+
+    seen = []
+    assert realtime.read_exact(Trickle(b"0123456789"), 8, seen.append) == b"01234567"
+    assert seen == [3, 3, 2]
+
+
+def test_latency_samples_rounds_lookahead_up_to_frames():
+    d = realtime.StreamDenoiser(44100, {"n_fft": 8192}, frame=4410)
+    assert d.latency_samples == 3 * 4410
@@ -0,0 +1,83 @@
+import itertools
+import os
+import types
+
+import pytest
+
+import result_cache
+import settings
+from result_cache import ResultCache, process_cached
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    clock = itertools.count(1)
+    monkeypatch.setattr(result_cache, "time", types.SimpleNamespace(time=lambda: next(clock)))
+    return ResultCache(str(tmp_path / "cache"))
+
+
+def _processor(calls):
+    def process(file_path, out_path, params, *_):
+        calls.append(file_path)
+        with open(file_path, "rb") as f, open(out_path, "wb") as out:
+            out.write(f.read()[::-1])
+        return out_path
+    return process
+
+
+def test_hit_and_miss(tmp_path, cache):
+    src, out = str(tmp_path / "a.wav"), str(tmp_path / "a_cleaned.wav")
+    with open(src, "wb") as f:
+        f.write(b"abc" * 100)
+    params, calls = settings.default_params(), []
+    run = lambda p=params: process_cached(src, out, p, cache, process=_processor(calls))[1]
+
+    assert run() is False
+    os.remove(out)
+    assert run() is True and len(calls) == 1
+    with open(out, "rb") as f:
+        assert f.read() == (b"abc" * 100)[::-1]
+    assert run(dict(params, chunk_workers=7)) is True  # doesn't change the output
+    assert run(dict(params, cutoff_hz=5000)) is False
+
+    with open(src, "wb") as f:
+        f.write(b"abd" * 100)
+    assert run() is False
+    assert (cache.hits, cache.misses) == (2, 3)
+
+
+def test_large_file_edit_outside_samples_misses(tmp_path, cache):
+    src, out = str(tmp_path / "long.wav"), str(tmp_path / "long_cleaned.wav")
+    data = bytearray(os.urandom(8 << 20))
+    with open(src, "wb") as f:
+        f.write(data)
+    calls = []
+    key = cache.key(src, settings.default_params(), out)
+    assert process_cached(src, out, None, cache, process=_processor(calls))[1] is False
+
+    # Same size, same head/middle/tail samples: only the mtime tells the edit apart
+    data[1 << 21] ^= 0xFF
+    st = os.stat(src)
+    with open(src, "wb") as f:
+        f.write(data)
+    os.utime(src, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+    assert cache.key(src, settings.default_params(), out) != key
+    assert process_cached(src, out, None, cache, process=_processor(calls))[1] is False
+
+
+def test_lru_eviction(tmp_path, cache):
+    cache.max_bytes = 250
+    outs = {}
+    for name in "abc":
+        outs[name] = str(tmp_path / f"{name}.wav")
+        with open(outs[name], "wb") as f:
+            f.write(name.encode() * 100)
+    cache.store("a-key.wav", outs["a"])
+    cache.store("b-key.wav", outs["b"])
+    assert cache.fetch("a-key.wav", str(tmp_path / "copy.wav"))  # a is now the most recently used
+    cache.store("c-key.wav", outs["c"])
+
+    assert cache.fetch("a-key.wav", str(tmp_path / "copy.wav"))
+    assert cache.fetch("c-key.wav", str(tmp_path / "copy.wav"))
+    assert not cache.fetch("b-key.wav", str(tmp_path / "copy.wav"))
+    assert not os.path.exists(cache._entry_path("b-key.wav"))
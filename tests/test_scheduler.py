@@ -0,0 +1,66 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+import soundfile as sf
+
+import scheduler
+import settings
+from scheduler import JobScheduler
+
+
+def test_streaming_estimate_is_block_footprint(tmp_path):
+    path = str(tmp_path / "long.wav")
+    sf.write(path, np.zeros((600 * 8000, 2), dtype=np.float32), 8000)
+    assert scheduler.estimate_decoded_bytes(path) == 600 * 8000 * 2 * 4
+    block, scan = 10 * 8000, 120 * 8000
+    assert scheduler.estimate_decoded_bytes(path, block_seconds=10, scan_seconds=120) == \
+        scheduler.STREAM_JOB_BYTES + 2 * (block * scheduler.STREAM_BYTES_PER_BLOCK_SAMPLE
+                                          + scan * scheduler.STREAM_BYTES_PER_SCAN_SAMPLE)
+
+    sched = JobScheduler()
+    sched.configure(dict(settings.default_params(), streaming=True, noise_scan_seconds=None))
+    assert (sched.block_seconds, sched.scan_seconds) == (settings.STREAM_BLOCK_SECONDS, settings.NOISE_SCAN_SECONDS)
+    sched.configure(settings.default_params())
+    assert sched.block_seconds is None
+
+
+_MEASURE = """
+import resource, sys
+import engine, settings
+params = dict(settings.default_params(), streaming=True, block_seconds=5.0, noise_scan_seconds=10.0,
+              chunk_workers=1, profile_cache_dir=None, checkpoint_seconds=None)
+before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+engine.process_file(sys.argv[1], sys.argv[2], params)
+print((resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - before) * 1024)
+"""
+
+
+def test_streaming_estimate_tracks_peak_rss(tmp_path):
+    path = str(tmp_path / "in.wav")
+    sf.write(path, np.random.default_rng(0).normal(0, 0.05, 20 * 44100).astype(np.float32), 44100)
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=root, XDG_CACHE_HOME=str(tmp_path / "cache"))
+    run = subprocess.run([sys.executable, "-c", _MEASURE, path, str(tmp_path / "out.wav")],
+                         env=env, capture_output=True, text=True, check=True)
+    measured = int(run.stdout.split()[-1])
+    charged = scheduler.estimate_decoded_bytes(path, block_seconds=5.0, scan_seconds=10.0)
+    assert measured / 1.5 < charged < measured * 2
+
+
+def test_shortest_does_not_starve_large_jobs():
+    sched = JobScheduler(max_concurrent=3, memory_budget=100, policy="shortest")
+    sched.submit("first", 60)
+    assert sched.take_ready() == ["first"]
+    sched.submit("big", 60)  # doesn't fit beside "first"
+    for i in range(scheduler.MAX_OVERTAKES):
+        sched.submit(f"small{i}", 10)
+        assert sched.take_ready() == [f"small{i}"]
+        sched.finish(f"small{i}")
+
+    # "big" is overdue now: small jobs wait behind it instead of overtaking again
+    sched.submit("late", 10)
+    assert sched.take_ready() == []
+    sched.finish("first")
+    assert sched.take_ready() == ["big", "late"]
@@ -0,0 +1,32 @@
+import numpy as np
+import soundfile as sf
+
+import engine
+import settings
+
+
+def test_whole_file_scan_is_bounded_when_streaming(tmp_path, monkeypatch):
+    sr = 16000
+    path = str(tmp_path / "in.wav")
+    sf.write(path, np.random.default_rng(0).normal(0, 0.05, 30 * sr).astype(np.float32), sr)
+    monkeypatch.setattr(engine, "NOISE_SCAN_SECONDS", 4.0)
+    params = dict(settings.default_params(), streaming=True, block_seconds=2.0, noise_scan_seconds=None,
+                  chunk_workers=1, profile_cache_dir=None, checkpoint_seconds=None)
+
+    seen = {"progress": 0.0}
+    buffered = []
+    noise_sample = engine.noise_sample
+
+    def spy(y, work_sr, *args, **kwargs):
+        buffered.append((y.shape[-1] / work_sr, seen["progress"]))
+        return noise_sample(y, work_sr, *args, **kwargs)
+
+    monkeypatch.setattr(engine, "noise_sample", spy)
+    engine.process_file(path, str(tmp_path / "out.wav"), params,
+                        progress=lambda f: seen.update(progress=f))
+
+    # Profiles come from the scanned head, not from a file held in memory until EOF
+    (head_seconds, progress_then), = buffered
+    assert head_seconds <= 4.0 + params["block_seconds"]
+    assert progress_then < 0.5
+    assert sf.info(str(tmp_path / "out.wav")).frames == 30 * sr
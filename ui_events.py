@@ -0,0 +1,44 @@
+"""Worker-to-UI message channel.
+
+Tk must only be touched from the main loop, and posting one `after(0, ...)`
+per chunk from every worker floods Tk's event queue. Workers post here
+instead; the main loop drains the queue on a fixed tick. Updates that only
+need their latest value (progress, current stage, sidebar refreshes) are
+coalesced by key, so a tick runs at most one of each no matter how many
+were posted.
+"""
+import threading
+from collections import deque
+
+TICK_MS = 33  # ~30 Hz
+
+
+class UiEventQueue:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ordered = deque()
+        self._latest = {}
+
+    def post(self, handler, *args):
+        """Queue handler(*args); every posted event runs, in order."""
+        with self._lock:
+            self._ordered.append((handler, args))
+
+    def post_latest(self, key, handler, *args):
+        """Queue handler(*args), replacing anything still queued under the same key."""
+        with self._lock:
+            self._latest.pop(key, None)  # re-insert so it runs after earlier keys
+            self._latest[key] = (handler, args)
+
+    def drain(self) -> list:
+        """Take everything queued: coalesced updates first, then ordered events.
+
+        Coalesced updates were posted before anything that follows them in
+        the same tick (a job's last progress before its completion), so
+        running them first keeps each job's events in order.
+        """
+        with self._lock:
+            events = list(self._latest.values()) + list(self._ordered)
+            self._latest.clear()
+            self._ordered.clear()
+        return events
@@ -0,0 +1,236 @@
+"""Hot-folder watching: notice new recordings and hand them over once they are fully written.
+
+Linux uses inotify (through libc, no extra dependency), so after one initial
+scan only the files that actually change are looked at. Elsewhere, or for
+network shares where inotify sees no remote writes, the folders are polled.
+Either way a file is only handed over after its size and mtime have stayed
+the same for `stable_seconds`, so half-copied files are never picked up.
+
+Ready files wait in the watcher until the consumer `take()`s them, so the
+consumer decides how many it can handle (backpressure) and nothing is lost
+while it is busy.
+"""
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from collections import deque
+
+AUDIO_EXTS = (".wav", ".mp3", ".flac", ".ogg", ".m4a")
+STABLE_SECONDS = 5.0
+POLL_SECONDS = 2.0
+CHECK_SECONDS = 0.5
+
+_IN_MODIFY = 0x2
+_IN_CLOSE_WRITE = 0x8
+_IN_MOVED_TO = 0x80
+_IN_CREATE = 0x100
+_IN_Q_OVERFLOW = 0x4000
+_IN_ISDIR = 0x40000000
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_EVENT = struct.Struct("iIII")
+
+
+def is_cleaned_output(path: str) -> bool:
+    return os.path.splitext(os.path.basename(path))[0].endswith("_cleaned")
+
+
+def is_candidate(path: str) -> bool:
+    """Audio inputs only: no cleaned outputs, no hidden/partial temp files."""
+    name = os.path.basename(path)
+    return (name.lower().endswith(AUDIO_EXTS) and not name.startswith(".")
+            and not is_cleaned_output(path))
+
+
+def output_is_current(in_path: str, out_path: str) -> bool:
+    """True if out_path exists and is at least as new as in_path."""
+    try:
+        return os.path.getmtime(out_path) >= os.path.getmtime(in_path)
+    except OSError:
+        return False
+
+
+class _Inotify:
+    def __init__(self):
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = self._libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, f"inotify_init1: {os.strerror(err)}")
+        self._folders = {}
+
+    def add(self, folder: str):
+        mask = _IN_CREATE | _IN_MOVED_TO | _IN_CLOSE_WRITE | _IN_MODIFY
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(folder), mask)
+        if wd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, f"inotify_add_watch {folder}: {os.strerror(err)}")
+        self._folders[wd] = folder
+
+    def read(self, timeout: float):
+        """Paths touched since the last read; None if the kernel queue overflowed."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        paths, pos = [], 0
+        while pos + _EVENT.size <= len(data):
+            wd, mask, _, length = _EVENT.unpack_from(data, pos)
+            pos += _EVENT.size
+            name = data[pos:pos + length].rstrip(b"\0")
+            pos += length
+            if mask & _IN_Q_OVERFLOW:
+                return None
+            if name and not mask & _IN_ISDIR and wd in self._folders:
+                paths.append(os.path.join(self._folders[wd], os.fsdecode(name)))
+        return paths
+
+    def close(self):
+        os.close(self.fd)
+
+
+def _signature(path: str):
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+
+class FolderWatcher:
+    """Watch folders (non-recursively) for new, fully written audio files.
+
+    `is_processed(path)` lets the caller skip inputs whose output already
+    exists. `use_inotify=None` picks inotify where available; False forces
+    polling every `poll_seconds`.
+    """
+
+    def __init__(self, folders, is_processed=None, stable_seconds: float = STABLE_SECONDS,
+                 poll_seconds: float = POLL_SECONDS, use_inotify: bool = None):
+        self.folders = [os.path.abspath(f) for f in folders]
+        self.is_processed = is_processed or (lambda path: False)
+        self.stable_seconds = stable_seconds
+        self.poll_seconds = poll_seconds
+        self.use_inotify = sys.platform.startswith("linux") if use_inotify is None else use_inotify
+        self.mode = None
+        self._candidates = {}  # path -> (signature, unchanged since)
+        self._delivered = {}  # path -> signature when handed over
+        self._ready = deque()
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        for f in self.folders:
+            if not os.path.isdir(f):
+                raise NotADirectoryError(f)
+        notifier = None
+        if self.use_inotify:
+            try:
+                notifier = _Inotify()
+                for f in self.folders:
+                    notifier.add(f)
+            except (OSError, AttributeError) as e:
+                print(f"inotify unavailable ({e}), polling instead")
+                if notifier:
+                    notifier.close()
+                notifier = None
+        self.mode = "inotify" if notifier else "polling"
+        self._thread = threading.Thread(target=self._run, args=(notifier,), daemon=True, name="watcher")
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread:
+            self._thread.join()
+
+    def take(self, max_items: int = None) -> list:
+        """Remove and return up to max_items ready files (all if None), oldest first."""
+        with self._cond:
+            n = len(self._ready) if max_items is None else min(max_items, len(self._ready))
+            return [self._ready.popleft() for _ in range(n)]
+
+    def wait(self, timeout: float = None) -> bool:
+        """Block until a file is ready or the watcher stops; True if one is ready."""
+        with self._cond:
+            if not self._ready and not self._stop.is_set():
+                self._cond.wait(timeout)
+            return bool(self._ready)
+
+    def ready_count(self) -> int:
+        with self._cond:
+            return len(self._ready)
+
+    # --- watcher thread ---
+    def _scan(self):
+        for folder in self.folders:
+            try:
+                with os.scandir(folder) as it:
+                    for entry in it:
+                        if entry.is_file():
+                            self._notice(entry.path)
+            except OSError as e:
+                print(f"Cannot scan {folder}: {e}")
+
+    def _notice(self, path: str):
+        if not is_candidate(path) or path in self._candidates:
+            return
+        try:
+            sig = _signature(path)
+        except OSError:
+            return
+        if self._delivered.get(path) == sig:
+            return
+        self._candidates[path] = (sig, time.monotonic())
+
+    def _check_candidates(self):
+        now = time.monotonic()
+        for path, (sig, since) in list(self._candidates.items()):
+            try:
+                current = _signature(path)
+            except OSError:
+                del self._candidates[path]  # deleted or renamed away
+                continue
+            if current != sig:
+                self._candidates[path] = (current, now)
+                continue
+            if now - since < self.stable_seconds:
+                continue
+            del self._candidates[path]
+            if sig[0] == 0:
+                continue  # an empty placeholder; its first write will be noticed again
+            self._delivered[path] = sig
+            if not self.is_processed(path):
+                with self._cond:
+                    self._ready.append(path)
+                    self._cond.notify_all()
+
+    def _run(self, notifier):
+        try:
+            self._scan()
+            next_scan = time.monotonic() + self.poll_seconds
+            while not self._stop.is_set():
+                if notifier:
+                    paths = notifier.read(CHECK_SECONDS)
+                    if paths is None:
+                        self._scan()  # events were dropped; catch up once
+                    else:
+                        for p in paths:
+                            self._notice(p)
+                else:
+                    self._stop.wait(CHECK_SECONDS)
+                    if time.monotonic() >= next_scan:
+                        self._scan()
+                        next_scan = time.monotonic() + self.poll_seconds
+                self._check_candidates()
+        finally:
+            if notifier:
+                notifier.close()